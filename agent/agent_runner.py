@@ -9,7 +9,7 @@ from .llm_core import agent
 from .tools_agent.toolagent_runner import compile_app as compile_tool_agent
 import time
 from .log.logger import logger
-from .memory.mem0 import Mem0Memory
+from .memory.mem0 import get_memory
 
 dotenv.load_dotenv()
 
@@ -37,7 +37,7 @@ async def tool_agent_node(state: PlannerState):
         memory_client = None
         try:
             user_id = state.get("user_id", "default_user")
-            memory_client = Mem0Memory(user_id=user_id)
+            memory_client = get_memory(user_id)
         except Exception as e:
             print(f"[agent_runner] Warning: Failed to initialize memory client: {e}")
         
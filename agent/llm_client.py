@@ -0,0 +1,40 @@
+import os
+import functools
+
+import dotenv
+import httpx
+from langchain_deepseek import ChatDeepSeek
+
+dotenv.load_dotenv()
+
+# one keep-alive pool per process, shared by the planner and the tool agent
+_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+
+
+@functools.lru_cache(maxsize=4)
+def get_deepseek_llm(model: str = "deepseek-chat", temperature: float = 0) -> ChatDeepSeek:
+    """Return a cached ChatDeepSeek client so every caller reuses the same connections."""
+    # DeepSeek uses OpenAI-compatible API
+    return ChatDeepSeek(
+        model=model,
+        temperature=temperature,
+        api_key=os.environ["DEEPSEEK_API_KEY"],
+        base_url=os.getenv("DEEPSEEK_API_BASE", "https://api.deepseek.com"),
+        http_client=httpx.Client(limits=_HTTP_LIMITS),
+        http_async_client=httpx.AsyncClient(limits=_HTTP_LIMITS),
+    )
+
+
+# bound runnables keyed by (llm, tool names); bind_tools re-serialises every tool schema
+_BOUND: dict[tuple, object] = {}
+
+
+def bind_tools_cached(llm: ChatDeepSeek, tools: list):
+    """Return llm.bind_tools(tools), reusing the binding while the tool names are unchanged."""
+    if not tools:
+        return llm
+    key = (id(llm), tuple(t.name for t in tools))
+    bound = _BOUND.get(key)
+    if bound is None:
+        bound = _BOUND[key] = llm.bind_tools(tools)
+    return bound
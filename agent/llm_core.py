@@ -1,12 +1,13 @@
 import os
+import re
 from pathlib import Path
 import dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from typing import Any
-from langchain_deepseek import ChatDeepSeek
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from .llm_client import get_deepseek_llm, bind_tools_cached
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
 from .graph_state import PlannerState
-from .memory.mem0 import Mem0Memory
+from .memory.mem0 import get_memory
 from .planner_tool.delegate import DelegateTool
 
 dotenv.load_dotenv()
@@ -21,12 +22,7 @@ based_llm = ChatGoogleGenerativeAI(
         google_api_key=os.environ["GEMINI_API_KEY"],
     )
 """
-based_llm = ChatDeepSeek(
-    model="deepseek-chat",
-    temperature=0,
-    api_key=os.environ["DEEPSEEK_API_KEY"],
-    base_url=os.getenv("DEEPSEEK_API_BASE", "https://api.deepseek.com"),
-)
+based_llm = get_deepseek_llm("deepseek-chat", 0)
 
 
 
@@ -53,6 +49,27 @@ def _flatten_content(content: Any) -> str:
 
     return str(content)
 
+# small talk that never needs delegation; anything else keeps the tool schema attached
+_SMALL_TALK = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|thx|ok|okay|cool|great|bye|goodbye|good (morning|afternoon|evening|night))"
+    r"[\s!.,]*$",
+    re.IGNORECASE,
+)
+# how many trailing messages to check for recent tool use
+_TOOL_HISTORY_WINDOW = 6
+
+
+def _needs_tools(messages: list, query: str) -> bool:
+    """
+    Decide whether this turn should send the tool schema.
+    Tools stay bound while tools were used recently, and for every query except plain small talk.
+    """
+    for msg in messages[-_TOOL_HISTORY_WINDOW:]:
+        if isinstance(msg, ToolMessage) or getattr(msg, "tool_calls", None):
+            return True
+    return not _SMALL_TALK.match(query or "")
+
+
 def get_planner_tools():
     """
     Returns a reduced set of tools for the planner.
@@ -69,7 +86,7 @@ def agent(state: PlannerState) -> PlannerState:
     long_memory_context = ""
     short_memory_context = ""
     try:
-        memory_client = Mem0Memory(user_id=user_id)
+        memory_client = get_memory(user_id)
         relevant_Lmemories = memory_client.search(query)
         if relevant_Lmemories:
             # Extract text from memory results
@@ -119,12 +136,12 @@ def agent(state: PlannerState) -> PlannerState:
     
     
     if not isinstance(messages[0], SystemMessage) and current_system_prompt:
-        messages = [SystemMessage(content=current_system_prompt)] + messages
+        messages = [SystemMessage(content=current_system_prompt), *messages]
 
     try:
-        tools = get_planner_tools()
-        base = based_llm
-        llm = base.bind_tools(tools) if tools else base
+        # skip the tool schema on small-talk turns, it is pure payload there
+        tools = get_planner_tools() if _needs_tools(messages, query) else []
+        llm = bind_tools_cached(based_llm, tools)
 
         print(f"[agent] Invoking LLM with {len(messages)} messages")
         response = llm.invoke(messages)
@@ -136,7 +153,7 @@ def agent(state: PlannerState) -> PlannerState:
         if has_tool:
             print(f"[agent] Tool calls: {[tc.get('name') for tc in response.tool_calls]}")
 
-        new_messages = messages + [response]
+        new_messages = [*messages, response]
         new_state = {**state, "message": new_messages}
         if not has_tool and isinstance(response, AIMessage):
             normalized_output = _flatten_content(response.content)
@@ -155,13 +172,11 @@ def agent(state: PlannerState) -> PlannerState:
                         "content": normalized_output
                     }
                 ]
-                try:
-                    memory_client.add(messages=update_mem)  # Save last user and AI messages
-                    # save short term memory as well
-                    memory_client.add(messages=update_mem, session_id=state.get("session_id", "default_session"), infer=False)
-                    print(f"[agent] Saved interaction to memory")
-                except Exception as e:
-                    print(f"[agent] Failed to save interaction to memory: {repr(e)}")
+                # written on the mem0 writer thread, failures are logged there
+                memory_client.add_in_background(messages=update_mem)  # Save last user and AI messages
+                # save short term memory as well
+                memory_client.add_in_background(messages=update_mem, session_id=state.get("session_id", "default_session"), infer=False)
+                print(f"[agent] Queued interaction for memory")
 
         return new_state
     except Exception as e:
@@ -170,4 +185,4 @@ def agent(state: PlannerState) -> PlannerState:
         traceback.print_exc()
         error_msg = f"I encountered an error: {str(e)}. Please try again or ask a different question."
         fallback = AIMessage(content=error_msg)
-        return {**state, "message": messages + [fallback], "output": error_msg}
+        return {**state, "message": [*messages, fallback], "output": error_msg}
@@ -1,5 +1,7 @@
+import functools
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -15,6 +17,10 @@ except ImportError:  # pragma: no cover - handled at runtime
     Memory = None
 
 
+# single writer thread: memory writes leave the agent's turn but keep their order
+_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mem0-writer")
+
+
 class Mem0MemoryError(RuntimeError):
     """Raised when the mem0-backed memory cannot be used."""
 
@@ -101,9 +107,25 @@ class Mem0Memory:
             infer=infer,
         )
 
+    def add_in_background(self, messages: List[Any], session_id: str = None, infer: bool = True) -> None:
+        """ Queue add() on the writer thread so the caller does not wait for the memory round-trip """
+        future = _WRITER.submit(self.add, messages, session_id, infer)
+        future.add_done_callback(self._log_add_failure)
+
+    def _log_add_failure(self, future) -> None:
+        exc = future.exception()
+        if exc is not None:
+            logger.error(f"[mem0] Background add for user {self.user_id} failed: {exc!r}")
+
     def clear_short_term_memory(self, session_id: str) -> None:
         """ Clear short-term memory for a specific session """
         self.memory.delete_all(
             user_id=self.user_id,
             run_id=session_id,
-        )
\ No newline at end of file
+        )
+
+
+@functools.lru_cache(maxsize=128)
+def get_memory(user_id: str) -> Mem0Memory:
+    """ Return the Mem0Memory for a user, created once and reused across agent turns """
+    return Mem0Memory(user_id=user_id)
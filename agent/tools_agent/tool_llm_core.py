@@ -1,13 +1,13 @@
 import os
 from pathlib import Path
 import dotenv
-import json
-from langchain_deepseek import ChatDeepSeek
+import orjson
+from ..llm_client import get_deepseek_llm, bind_tools_cached
 # from langchain_community.chat_models import ChatOllama
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
 from ..graph_state import ToolState
 from .tools.tool_box import tool_box
-from ..memory.mem0 import Mem0Memory
+from ..memory.mem0 import get_memory
 
 
 
@@ -16,13 +16,8 @@ dotenv.load_dotenv()
 system_prompt_path = Path(__file__).parent / "tool_systemprompt.md"
 system_prompt = system_prompt_path.read_text(encoding="utf-8") if system_prompt_path.exists() else ""
 
-# DeepSeek uses OpenAI-compatible API; pass api_key/base_url in model_kwargs to avoid payload errors
-based_llm = ChatDeepSeek(
-    model="deepseek-chat",
-    temperature=0,
-    api_key=os.environ["DEEPSEEK_API_KEY"],
-    base_url=os.getenv("DEEPSEEK_API_BASE", "https://api.deepseek.com"),
-)
+# same cached client as the planner, so both agents share one connection pool
+based_llm = get_deepseek_llm("deepseek-chat", 0)
 
 """
 based_llm = ChatOllama(
@@ -47,12 +42,11 @@ def agent(state: ToolState) -> ToolState:
     
     
     if not isinstance(messages[0], SystemMessage) and system_prompt:
-        messages = [SystemMessage(content=system_prompt)] + messages
+        messages = [SystemMessage(content=system_prompt), *messages]
 
     try:
         tools = tool_box()
-        base = based_llm
-        llm = base.bind_tools(tools) if tools else base
+        llm = bind_tools_cached(based_llm, tools)
 
         print(f"[tool_agent] Invoking LLM with {len(messages)} messages")
         response = llm.invoke(messages)
@@ -64,15 +58,15 @@ def agent(state: ToolState) -> ToolState:
         if has_tool:
             print(f"[tool_agent] Tool calls: {[tc.get('name') for tc in response.tool_calls]}")
 
-        new_messages = messages + [response]
+        new_messages = [*messages, response]
         new_state = {**state, "message": new_messages}
         try:
-            memory_client = Mem0Memory(user_id=state.get("user_id", "default_user"), session_id=state.get("session_id", "default_session"))
+            memory_client = get_memory(state.get("user_id", "default_user"))
             if memory_client and isinstance(messages[-1], ToolMessage):
                 tool_content = messages[-1].content
                 if not isinstance(tool_content, str):
                     try:
-                        tool_content = json.dumps(tool_content, ensure_ascii=False)
+                        tool_content = orjson.dumps(tool_content).decode()
                     except Exception:
                         tool_content = str(tool_content)
                 messages=[
@@ -82,12 +76,12 @@ def agent(state: ToolState) -> ToolState:
                     }
                 ]
                 # beacuse the facts can not be longterm memory so we use session and 
-                memory_client.add(
+                memory_client.add_in_background(
                     messages=messages,
                     session_id=state.get("session_id", "default_session"),
                     infer=False
                 )
-                print(f"[tool_agent] Added ToolMessage to memory{messages} for user {memory_client.user_id}")
+                print(f"[tool_agent] Queued ToolMessage for memory{messages} for user {memory_client.user_id}")
         except Exception as e:
             print(f"[tool_agent] Warning: Failed to add to memory: {e}")
             
@@ -102,4 +96,4 @@ def agent(state: ToolState) -> ToolState:
         traceback.print_exc()
         error_msg = f"I encountered an error: {str(e)}. Please try again or ask a different question."
         fallback = AIMessage(content=error_msg)
-        return {**state, "message": messages + [fallback], "output": error_msg}
+        return {**state, "message": [*messages, fallback], "output": error_msg}
@@ -1,5 +1,7 @@
+import asyncio
 import dotenv
-import json
+import orjson
+from typing import Any, Awaitable, Callable
 from langgraph.graph import StateGraph
 from langgraph.constants import END
 from ..graph_state import ToolState
@@ -35,6 +37,112 @@ def check_tool_call(state: ToolState):
 
 _tools_cache = {tool.name: tool for tool in tool_box()}
 
+
+def _resolve_invoker(tool) -> Callable[[dict], Awaitable[Any]]:
+    """Pick a tool's invocation method once, returning an async callable taking the tool args."""
+    # Method 1: Try ainvoke (for MCP tools and modern LangChain tools)
+    if hasattr(tool, 'ainvoke'):
+        async def _ainvoke(args):
+            try:
+                return await tool.ainvoke(args)
+            except TypeError as e:
+                # MCP tools might need config parameter
+                if 'config' in str(e):
+                    from langchain_core.runnables import RunnableConfig
+                    return await tool.ainvoke(args, config=RunnableConfig())
+                raise
+        return _ainvoke
+
+    # Method 2: Try _arun (for custom async tools)
+    if hasattr(tool, '_arun'):
+        return lambda args: tool._arun(**args)
+
+    # Method 3 / 4: sync invoke or _run, kept off the event loop
+    if hasattr(tool, 'invoke'):
+        return lambda args: asyncio.to_thread(tool.invoke, args)
+    if hasattr(tool, '_run'):
+        return lambda args: asyncio.to_thread(lambda: tool._run(**args))
+
+    async def _missing(args):
+        raise ValueError(f"Tool {tool.name} has no invocation method")
+    return _missing
+
+
+# tool name -> resolved async invoker, so a tool call is one dict probe and one await
+_tool_dispatch = {name: _resolve_invoker(tool) for name, tool in _tools_cache.items()}
+
+
+async def _run_tool_call(tool_call: dict) -> ToolMessage:
+    """Execute one tool call; errors come back as a ToolMessage so sibling calls keep running."""
+    tool_name = tool_call.get('name')
+    tool_args = tool_call.get('args', {})
+    tool_call_id = tool_call.get('id', '')
+
+    print(f"[tool_wrapper] Executing tool: {tool_name} with args: {tool_args}")
+
+    invoke = _tool_dispatch.get(tool_name)
+    if invoke is None:
+        error_msg = f"Tool '{tool_name}' not found. Available tools: {list(_tool_dispatch.keys())}"
+        print(f"[tool_wrapper] Error: {error_msg}")
+        return ToolMessage(
+            content=error_msg,
+            tool_call_id=tool_call_id,
+            name=tool_name
+        )
+
+    try:
+        result = await invoke(tool_args)
+
+        print(f"[tool_wrapper] Tool {tool_name} result: {str(result)[:200]}...")
+
+        # Parse result for images if it matches RAG tool output pattern
+        parsed_content = None
+        # only a JSON list can carry RAG images, skip parsing plain-text results
+        if isinstance(result, str) and result.lstrip().startswith("["):
+            try:
+                parsed = orjson.loads(result)
+                if isinstance(parsed, list) and any(item.get("images") for item in parsed if isinstance(item, dict)):
+                    message_content = []
+                    for item in parsed:
+                        # orjson.loads gives a fresh dict per item, so pop images in place instead of copying
+                        item_images = (item.pop("images", None) or []) if isinstance(item, dict) else []
+
+                        # Add text part, serialised once; items that only carried images add none
+                        if item:
+                            message_content.append({
+                                "type": "text",
+                                "text": orjson.dumps(item).decode()
+                            })
+
+                        # Add image parts
+                        for img in item_images:
+                            if img.get("data_url"):
+                                message_content.append({
+                                    "type": "image_url",
+                                    "image_url": {"url": img["data_url"]}
+                                })
+                    parsed_content = message_content
+            except (orjson.JSONDecodeError, TypeError, AttributeError):
+                pass
+
+        return ToolMessage(
+            content=parsed_content if parsed_content else str(result),
+            tool_call_id=tool_call_id,
+            name=tool_name
+        )
+    except Exception as e:
+        error_msg = f"Error executing tool '{tool_name}': {str(e)}"
+        print(f"[tool_wrapper] {error_msg}")
+        import traceback
+        traceback.print_exc()
+
+        return ToolMessage(
+            content=error_msg,
+            tool_call_id=tool_call_id,
+            name=tool_name
+        )
+
+
 # the tool_wrapper manually executes tools without using ToolNode
 async def tool_wrapper(state: ToolState):
     """
@@ -56,111 +164,11 @@ async def tool_wrapper(state: ToolState):
     if not tool_calls:
         return state
 
-    # Get available tools
-    tools = _tools_cache
-
-    # Execute each tool call
-    tool_messages = []
-    for tool_call in tool_calls:
-        tool_name = tool_call.get('name')
-        tool_args = tool_call.get('args', {})
-        tool_call_id = tool_call.get('id', '')
-
-        print(f"[tool_wrapper] Executing tool: {tool_name} with args: {tool_args}")
-
-        if tool_name not in tools:
-            error_msg = f"Tool '{tool_name}' not found. Available tools: {list(tools.keys())}"
-            print(f"[tool_wrapper] Error: {error_msg}")
-            tool_messages.append(ToolMessage(
-                content=error_msg,
-                tool_call_id=tool_call_id,
-                name=tool_name
-            ))
-            continue
-
-        tool = tools[tool_name]
-
-        try:
-            # Try different invocation methods based on tool type
-            result = None
-
-            # Method 1: Try ainvoke (for MCP tools and modern LangChain tools)
-            if hasattr(tool, 'ainvoke'):
-                try:
-                    result = await tool.ainvoke(tool_args)
-                except TypeError as e:
-                    # MCP tools might need config parameter
-                    if 'config' in str(e):
-                        from langchain_core.runnables import RunnableConfig
-                        config = RunnableConfig()
-                        result = await tool.ainvoke(tool_args, config=config)
-                    else:
-                        raise
-
-            # Method 2: Try _arun (for custom async tools)
-            elif hasattr(tool, '_arun'):
-                result = await tool._arun(**tool_args)
-
-            # Method 3: Fall back to sync invoke
-            elif hasattr(tool, 'invoke'):
-                result = tool.invoke(tool_args)
-
-            # Method 4: Fall back to sync _run
-            elif hasattr(tool, '_run'):
-                result = tool._run(**tool_args)
-            else:
-                raise ValueError(f"Tool {tool_name} has no invocation method")
-
-            print(f"[tool_wrapper] Tool {tool_name} result: {str(result)[:200]}...")
-
-            # Parse result for images if it matches RAG tool output pattern
-            parsed_content = None
-            if isinstance(result, str):
-                try:
-                    parsed = json.loads(result)
-                    if isinstance(parsed, list) and any(item.get("images") for item in parsed if isinstance(item, dict)):
-                        message_content = []
-                        for item in parsed:
-                            # Use a copy to separate text and images
-                            item_text = item.copy()
-                            item_images = item_text.pop("images", [])
-                            
-                            # Add text part
-                            message_content.append({
-                                "type": "text",
-                                "text": json.dumps(item_text, ensure_ascii=False)
-                            })
-                            
-                            # Add image parts
-                            for img in item_images:
-                                if "data_url" in img and img["data_url"]:
-                                    message_content.append({
-                                        "type": "image_url",
-                                        "image_url": {"url": img["data_url"]}
-                                    })
-                        parsed_content = message_content
-                except (json.JSONDecodeError, TypeError):
-                    pass
-
-            tool_messages.append(ToolMessage(
-                content=parsed_content if parsed_content else str(result),
-                tool_call_id=tool_call_id,
-                name=tool_name
-            ))
-        except Exception as e:
-            error_msg = f"Error executing tool '{tool_name}': {str(e)}"
-            print(f"[tool_wrapper] {error_msg}")
-            import traceback
-            traceback.print_exc()
-
-            tool_messages.append(ToolMessage(
-                content=error_msg,
-                tool_call_id=tool_call_id,
-                name=tool_name
-            ))
+    # independent tool calls from one AI message run concurrently, gather keeps their order
+    tool_messages = await asyncio.gather(*(_run_tool_call(tc) for tc in tool_calls))
 
     # Return updated state with tool results
-    updated_messages = messages + tool_messages
+    updated_messages = [*messages, *tool_messages]
     return {
         **state,
         "message": updated_messages
@@ -0,0 +1,183 @@
+# text chunking shared by VanillaRAG and the chunking process pool
+# kept free of torch / sentence_transformers imports so pool workers start fast
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from .tokenizer import Tokenizer, TiktokenTokenizer
+
+# per-process tokenizer, set once by init_chunk_worker
+_WORKER_TOKENIZER: Tokenizer | None = None
+
+# chunk results keyed by file content hash and chunking settings, so unchanged files skip
+# tokenisation on rebuild; a hit refreshes the file's mtime and entries unused for
+# _CHUNK_CACHE_TTL are pruned by prune_chunk_cache
+_CHUNK_CACHE_DIR = Path(__file__).resolve().parent / "chunk_cache"
+_CHUNK_CACHE_TTL = 30 * 86400
+_CHUNK_TOKEN_SIZE = 1200
+_CHUNK_OVERLAP = 100
+
+# one chunking pool per process, created on first use and reused by every rebuild
+_CHUNK_POOL: ProcessPoolExecutor | None = None
+_CHUNK_POOL_LOCK = threading.Lock()
+
+
+def chunk_text(
+    tokenizer: Tokenizer,
+    content: str,
+    split_by_character: str | None = None,
+    only_character: bool = False,
+    chunk_overlap: int = 100,
+    chunk_token_size: int = 1200,
+) -> list[dict[str, Any]]:
+    # chunk content by the token size or character
+    # each chunk is stripped once and appended directly, chunk_index counts pieces in split mode
+    result: list[dict[str, Any]] = []
+    if split_by_character:
+        for chunk in content.split(split_by_character):
+            if only_character:
+                stripped = chunk.strip()
+                result.append({
+                    "content": stripped,
+                    "chunk_length": len(stripped),
+                    "chunk_index": len(result)
+                })
+                continue
+            # reguler with token size
+            chunk_token = tokenizer.encode(chunk)
+            if len(chunk_token) > chunk_token_size:
+                for start in range(
+                    0, len(chunk_token), chunk_token_size - chunk_overlap
+                ):
+                    chunk_content = tokenizer.decode(
+                        chunk_token[start : start + chunk_token_size]
+                    )
+                    result.append({
+                        "content": chunk_content.strip(),
+                        "chunk_length": min(chunk_token_size, len(chunk_token) - start),
+                        "chunk_index": len(result)
+                    })
+            else:
+                result.append({
+                    "content": chunk.strip(),
+                    "chunk_length": len(chunk_token),
+                    "chunk_index": len(result)
+                })
+
+    else:
+        token = tokenizer.encode(content)
+        for start in range(0, len(token), chunk_token_size - chunk_overlap):
+            chunk_content = tokenizer.decode(
+                token[start : start + chunk_token_size]
+            )
+            result.append({
+                "content": chunk_content.strip(),
+                "chunk_length": min(chunk_token_size, len(token) - start),
+                "chunk_index": start
+            })
+    return result
+
+
+def chunk_pool() -> ProcessPoolExecutor:
+    """Return the shared chunking pool, starting it on first use."""
+    global _CHUNK_POOL
+    with _CHUNK_POOL_LOCK:
+        if _CHUNK_POOL is None:
+            # the caller has torch / CUDA, the sqlite writer and an event loop running on threads;
+            # forking that state can deadlock a child on a held lock, so workers start clean
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _CHUNK_POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context(method),
+                initializer=init_chunk_worker,
+            )
+        return _CHUNK_POOL
+
+
+def init_chunk_worker() -> None:
+    """Process pool initializer: load the tiktoken encoder once per worker."""
+    global _WORKER_TOKENIZER
+    _WORKER_TOKENIZER = TiktokenTokenizer()
+
+
+def chunk_file(file: Path, content: str | None = None) -> tuple[Path, list[dict[str, Any]]]:
+    """Read and chunk one file inside a pool worker, or chunk content already in memory."""
+    tokenizer = _WORKER_TOKENIZER
+    if tokenizer is None:
+        init_chunk_worker()
+        tokenizer = _WORKER_TOKENIZER
+
+    # text written by the PDF extractor is passed in directly, its utf-8 bytes match the file on disk
+    raw = file.read_bytes() if content is None else content.encode("utf-8")
+    is_csv = file.suffix.lower() == ".csv"
+    # chunking mode, sizes and tokenizer are part of the key: any of them changes the chunks
+    settings = f"{'csv' if is_csv else 'txt'}|{tokenizer.model_name}|{_CHUNK_TOKEN_SIZE}|{_CHUNK_OVERLAP}"
+    digest = hashlib.blake2b(settings.encode("utf-8"), digest_size=16)
+    digest.update(raw)
+    cache_file = _CHUNK_CACHE_DIR / f"{digest.hexdigest()}.json"
+    try:
+        chunks = orjson.loads(cache_file.read_bytes())
+        # mark the entry as recently used so pruning keeps it
+        os.utime(cache_file)
+        return file, chunks
+    except FileNotFoundError:
+        pass
+    except (OSError, orjson.JSONDecodeError):
+        # corrupt or partial cache entry, fall through and rebuild it
+        pass
+
+    if content is None:
+        try:
+            # decode the bytes already hashed instead of reading the file twice
+            content = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            content = raw.decode("utf-8", errors="ignore")
+
+    # separate csv by the line
+    if is_csv:
+        chunks = chunk_text(
+            tokenizer,
+            content,
+            split_by_character="\n",
+            only_character=True,
+            chunk_overlap=0,
+        )
+    else:
+        # separate by the token size
+        chunks = chunk_text(
+            tokenizer, content, chunk_overlap=_CHUNK_OVERLAP, chunk_token_size=_CHUNK_TOKEN_SIZE
+        )
+
+    _CHUNK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # write then rename so a concurrent worker never reads half a file
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    tmp_file.write_bytes(orjson.dumps(chunks))
+    tmp_file.replace(cache_file)
+    return file, chunks
+
+
+def prune_chunk_cache(ttl: float = _CHUNK_CACHE_TTL) -> int:
+    """Delete chunk cache entries not used for ttl seconds, plus any pre-JSON pickles; returns the count."""
+    if not _CHUNK_CACHE_DIR.is_dir():
+        return 0
+    cutoff = time.time() - ttl
+    removed = 0
+    for entry in _CHUNK_CACHE_DIR.iterdir():
+        try:
+            # .tmp files are only removed once stale, a live one belongs to a worker mid-write
+            if entry.suffix == ".pkl" or entry.stat().st_mtime < cutoff:
+                entry.unlink()
+                removed += 1
+        except OSError:
+            # raced with another process writing or pruning the same entry
+            pass
+    return removed
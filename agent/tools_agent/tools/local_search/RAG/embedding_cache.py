@@ -0,0 +1,65 @@
+# content-addressed embedding cache so rebuilds don't re-encode unchanged text
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+# sqlite caps the number of bound parameters per statement
+_SELECT_BATCH = 500
+
+
+class EmbeddingCache:
+    """
+    sqlite store of text -> embedding
+    key is blake2b(model_name + text), vectors are kept as float16 to halve the disk size
+    """
+
+    def __init__(self, path: Path, model_name: str):
+        self._path = Path(path)
+        self._prefix = f"{model_name}\0".encode("utf-8")
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            # warmup and sync tool calls may run on different threads, access is guarded by _lock
+            self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+        return self._conn
+
+    def key(self, text: str) -> bytes:
+        return hashlib.blake2b(self._prefix + text.encode("utf-8"), digest_size=16).digest()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """Return the cached vectors for whichever keys are present."""
+        found: dict[bytes, np.ndarray] = {}
+        if not keys:
+            return found
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(keys), _SELECT_BATCH):
+                batch = keys[start : start + _SELECT_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype="float16").astype("float32")
+        return found
+
+    def set_many(self, items: Iterable[tuple[bytes, np.ndarray]]) -> None:
+        rows = [(key, np.asarray(vec, dtype="float16").tobytes()) for key, vec in items]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+            conn.commit()
@@ -57,6 +57,10 @@ class FaissVectorStorage(BaseVectorStorage):
         self._hnsw_m = 16
         self._hnsw_ef_construction = 80
         self._hnsw_ef_search = 16
+        # "hnsw" keeps full fp32 vectors, "ivfpq" stores each vector as _pq_m bytes for large corpora
+        self._index_type = os.getenv("RAG_FAISS_INDEX", "hnsw").lower()
+        self._pq_m = 64
+        self._ivf_nprobe = 16
 
         # use cosine similarity with normalized vectors
         self._index = self._create_hnsw_index()
@@ -75,6 +79,9 @@ class FaissVectorStorage(BaseVectorStorage):
                         f"[{self.workspace}] FAISS index dim mismatch ({self._index.d} != {self._dim}), reinitializing."
                     )
                     self._index = self._create_hnsw_index()
+                elif isinstance(self._index, faiss.IndexIVF):
+                    # nprobe is a search-time setting and is not persisted with the index
+                    self._index.nprobe = min(self._ivf_nprobe, self._index.nlist)
 
                 if self._metadata_file.exists():
                     with open(self._metadata_file, "r", encoding="utf-8") as f:
@@ -99,6 +106,33 @@ class FaissVectorStorage(BaseVectorStorage):
         index.hnsw.efSearch = self._hnsw_ef_search
         return index
 
+    def _create_ivfpq_index(self, train_vectors: np.ndarray):
+        """Train an IVF-PQ index on normalized vectors, or return None when there are too few to train."""
+        n = len(train_vectors)
+        # PQ with 8 bits needs 256 training points per sub-quantizer
+        if self._dim % self._pq_m or n < 256:
+            return None
+        nlist = min(4096, n, max(1, int(4 * np.sqrt(n))))
+        quantizer = faiss.IndexFlatIP(self._dim)
+        index = faiss.IndexIVFPQ(quantizer, self._dim, nlist, self._pq_m, 8, faiss.METRIC_INNER_PRODUCT)
+        index.train(train_vectors)
+        index.nprobe = min(self._ivf_nprobe, nlist)
+        return index
+
+    def _add_vectors(self, vectors: np.ndarray) -> None:
+        """Add normalized vectors, training an empty index as IVF-PQ first when that is configured."""
+        if (
+            self._index_type == "ivfpq"
+            and self._index.ntotal == 0
+            and not isinstance(self._index, faiss.IndexIVFPQ)
+        ):
+            ivfpq = self._create_ivfpq_index(vectors)
+            if ivfpq is not None:
+                self._index = ivfpq
+            else:
+                logger.debug(f"[{self.workspace}] FAISS: too few vectors to train IVF-PQ, keeping HNSW.")
+        self._index.add(vectors)
+
     # hook for concurrency control
     async def get_index(self):
         return self._index
@@ -131,27 +165,33 @@ class FaissVectorStorage(BaseVectorStorage):
             contents.append(v["content"])
             metadatas.append(meta)
 
+        # smart batching: sort by length so each batch pads to similar-sized texts,
+        # SentenceTransformer only length-sorts inside a single encode call
+        order = sorted(range(len(contents)), key=lambda i: len(contents[i]))
+        sorted_contents = [contents[i] for i in order]
         batches = [
-            contents[i : i + self._embedding_batch] for i in range(0, len(contents), self._embedding_batch)
+            sorted_contents[i : i + self._embedding_batch]
+            for i in range(0, len(sorted_contents), self._embedding_batch)
         ]
 
-        embeddings_split: list[np.ndarray] = []
+        # each batch is scattered straight into its original rows of one preallocated matrix,
+        # so there is no per-batch list, final concatenate or un-sort copy
+        embeddings = np.empty((len(contents), self._dim), dtype="float32")
         if batches:
             desc = f"[{self.workspace}] Embedding batches"
+            off = 0
             with tqdm(total=len(batches), desc=desc, unit="batch") as pbar:
                 for batch in batches:
-                    embed = await self.embedding_func(batch)
-                    embeddings_split.append(np.asarray(embed, dtype="float32"))
+                    embed = np.asarray(await self.embedding_func(batch), dtype="float32")
+                    if len(embed) != len(batch):
+                        logger.error(
+                            f"[{self.workspace}] FAISS: embedding length {len(embed)} not match batch length {len(batch)}"
+                        )
+                        return []
+                    embeddings[order[off : off + len(batch)]] = embed
+                    off += len(batch)
                     pbar.update(1)
 
-        embeddings = np.concatenate(embeddings_split, axis=0) if embeddings_split else np.empty((0, self._dim))
-
-        if len(embeddings) != len(metadatas):
-            logger.error(
-                f"[{self.workspace}] FAISS: embedding length {len(embeddings)} not match metadata length {len(metadatas)}"
-            )
-            return []
-
         faiss.normalize_L2(embeddings)
 
         """
@@ -171,9 +211,8 @@ class FaissVectorStorage(BaseVectorStorage):
             await self._remove_faiss_ids(need_remove)
 
         async with self.lock:
-            index = await self.get_index()
-            start_idx = index.ntotal
-            index.add(embeddings)
+            start_idx = self._index.ntotal
+            self._add_vectors(embeddings)
 
             for i, meta in enumerate(metadatas):
                 faiss_id = start_idx + i
@@ -215,13 +254,20 @@ class FaissVectorStorage(BaseVectorStorage):
             if vector_keep:
                 arr = np.array(vector_keep, dtype="float32")
                 faiss.normalize_L2(arr)
-                self._index.add(arr)
+                self._add_vectors(arr)
 
             self._id_to_meta = new_id_to_meta
             self._save_faiss_index()
 
     # process query and find similarity vectors
-    async def query(self, query: str, top_k: int = 10, query_embedding: list[float] | None = None):
+    async def query_ids(
+        self, query: str, top_k: int = 10, query_embedding: list[float] | None = None
+    ) -> dict[str, np.ndarray]:
+        """Search the index and return hits as parallel arrays instead of per-hit dicts.
+
+        returns:
+            {"faiss_ids": int64 array, "ids": object array of custom ids, "distances": float32 array}
+        """
         if query_embedding is not None:
             embedding = np.array([query_embedding], dtype="float32")
         else:
@@ -233,21 +279,32 @@ class FaissVectorStorage(BaseVectorStorage):
         index = await self.get_index()
         distance, indices = index.search(embedding, k=top_k)
 
-        results = []
         if len(distance) == 0:
-            return results
+            return {
+                "faiss_ids": np.empty(0, dtype="int64"),
+                "ids": np.empty(0, dtype=object),
+                "distances": np.empty(0, dtype="float32"),
+            }
+
+        keep = (indices[0] != -1) & (distance[0] >= self.threshold)
+        faiss_ids = indices[0][keep]
+        ids = np.array(
+            [self._id_to_meta.get(int(fid), {}).get("__id__", "") for fid in faiss_ids], dtype=object
+        )
+        return {"faiss_ids": faiss_ids, "ids": ids, "distances": distance[0][keep]}
 
-        for dist, idx in zip(distance[0], indices[0]):
-            if idx == -1 or dist < self.threshold:
-                continue
+    async def query(self, query: str, top_k: int = 10, query_embedding: list[float] | None = None):
+        hits = await self.query_ids(query, top_k=top_k, query_embedding=query_embedding)
 
-            meta = self._id_to_meta.get(int(idx), {})
+        results = []
+        for fid, dist in zip(hits["faiss_ids"].tolist(), hits["distances"].tolist()):
+            meta = self._id_to_meta.get(fid, {})
             filtered_meta = {k: v for k, v in meta.items() if k != "__vector__"}
             results.append(
                 {
                     **filtered_meta,
                     "id": meta.get("__id__", ""),
-                    "distance": float(dist),
+                    "distance": dist,
                     "created_at": meta.get("created_at", 0),
                 }
             )
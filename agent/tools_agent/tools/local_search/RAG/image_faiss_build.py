@@ -1,15 +1,19 @@
 # build imae faiss storage
 import os
 import time
+import functools
 import json
 import asyncio
+import hashlib
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Optional, final, Any
 from PIL import Image
 import numpy as np
 import faiss
+import msgpack
 from dataclasses import dataclass
-from tqdm.auto import tqdm
+from concurrent.futures import ThreadPoolExecutor
 
 from .base import BaseVectorStorage
 from .....log.logger import logger
@@ -20,12 +24,82 @@ metadata structure:
     "faiss_id": {
         "__id__": "custom_id",
         "created_at": <timestamp>,
-        "vector": [float, ...],
         ...
     }
 }
+vectors are kept apart in a float32 matrix whose row faiss_id is that entry's vector
 """
 
+# shared decode workers: PIL releases the GIL while decoding, so decodes run in parallel
+_DECODE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="image-decode")
+
+
+# metadata paths are near-stationary, so each one is stat-ed once per process;
+# upsert clears the cache so newly extracted files are picked up
+@functools.lru_cache(maxsize=4096)
+def _resolve_path(path: str) -> str:
+    """Helper to resolve paths that might be from a different OS."""
+    if not path:
+        return ""
+    
+    # Helper to get safe filename from potential Windows path on Linux
+    def _get_safe_name(p: str) -> str:
+        s = str(p)
+        if "\\" in s:
+            return s.split("\\")[-1]
+        return Path(s).name
+
+    p = Path(path)
+    if p.exists():
+        return str(p.resolve())
+    
+    # Try finding in standard locations relative to this file
+    # __file__ is agent/tool/local_search/RAG/image_faiss_build.py
+    # pdf_pro is agent/tool/local_search/pdf_pro
+    try:
+        base_dir = Path(__file__).resolve().parent.parent / "pdf_pro"
+        if not base_dir.exists():
+            return path
+
+        filename = _get_safe_name(path)
+        
+        # Try images folder
+        candidate = base_dir / "images" / filename
+        if candidate.exists():
+            return str(candidate.resolve())
+        
+        # Try texts folder
+        candidate = base_dir / "texts" / filename
+        if candidate.exists():
+            return str(candidate.resolve())
+            
+    except Exception:
+        pass
+        
+    return path
+
+
+def _file_sig(path) -> Optional[list]:
+    """(path, size, mtime_ns) of an image file, or None when it cannot be stat-ed."""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    # a list, so it round-trips through msgpack unchanged
+    return [str(path), st.st_size, st.st_mtime_ns]
+
+
+def _load_rgb(path) -> Image.Image:
+    with Image.open(path) as img:
+        return img.convert("RGB")
+
+
+async def _decode_images(paths) -> list[Image.Image]:
+    """Decode images on the decode pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(loop.run_in_executor(_DECODE_POOL, _load_rgb, p) for p in paths))
+
+
 @final
 @dataclass
 class FaissImageStorage(BaseVectorStorage):
@@ -40,18 +114,52 @@ class FaissImageStorage(BaseVectorStorage):
 
         self.workspace_dir = workspace_dir
         self._faiss_index_file = workspace_dir / f"{self.namespace}_faiss.index"
+        # vectors live in a float32 .npy matrix (row = faiss id), the rest of the meta in msgpack;
+        # the old indent=2 JSON file is still read when the new pair is missing
+        self._vectors_file = Path(str(self._faiss_index_file) + ".vecs.npy")
+        self._meta_pack_file = Path(str(self._faiss_index_file) + ".meta.msgpack")
         self._metadata_file = Path(str(self._faiss_index_file) + ".meta.json")
         
         self._dim = self.embedding_func.embedding_dim
         
-        self.embedding_batch = 8
         self._hnsw_m = 16
         self.hnsw_ef_construction = 80
         self.hnsw_ef_search = 16
+        # past _sq_min_vectors the graph stores int8 codes (IndexHNSWSQ) instead of fp32;
+        # the fp32 matrix stays the source for training, rebuilds and get_vectors_by_ids
+        self._quantize = os.getenv("RAG_IMAGE_FAISS_QUANTIZE", "1").lower() not in ("0", "false", "no")
+        self._sq_min_vectors = 10000
         
         self.lock = asyncio.Lock()
+        # writes mark the store dirty; disk is only touched every _save_interval seconds
+        # and by index_done_callback / finalize, which always flush
+        self._dirty = False
+        self._last_save = 0.0
+        self._save_interval = 30.0
         self._index = self._create_hnsw_index()
         self._id_to_meta: dict[int, dict[str, Any]] = {}
+        # reverse index meta["__id__"] -> faiss id, kept in step with _id_to_meta
+        self._custom_to_faiss: dict[str, int] = {}
+        # file signature (path, size, mtime_ns) -> custom id of the entry embedded from it, so an
+        # unchanged file reuses that entry's vector on upsert; ids survive compaction unchanged
+        self._sig_to_custom: dict[tuple, str] = {}
+        # every stored vector in one float32 matrix, row = faiss id; rows past _n are spare capacity
+        self._vectors = np.empty((0, self._dim), dtype="float32")
+        self._n = 0
+        # faiss ids deleted from the metadata but still in the HNSW graph; skipped at query time
+        # and compacted away once they pass _compact_ratio of the index
+        self._tombstones: set[int] = set()
+        self._compact_ratio = 0.2
+        # LRU of normalized query embeddings, see query()
+        self._query_emb_cache: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._query_emb_cache_size = 512
+        # proximity cache: a query within _proximity_tau cosine distance of a recent one reuses its
+        # results; embeddings sit in one matrix so the lookup is a single gemv. Cleared on every write
+        self._proximity_size = 128
+        self._proximity_tau = 0.02
+        self._proximity_mat = np.empty((self._proximity_size, self._dim), dtype="float32")
+        self._proximity_entries: list[tuple[int, list[dict[str, Any]]]] = []
+        self._proximity_next = 0
         
         
     def _create_hnsw_index(self):
@@ -63,6 +171,35 @@ class FaissImageStorage(BaseVectorStorage):
         index.hnsw.efSearch = self.hnsw_ef_search
         # the deepth of search can be changed after index is built without re-indexing
         return index
+
+    def _create_sq_index(self, train_vectors: np.ndarray):
+        """Train an 8-bit scalar-quantized HNSW index on normalized vectors."""
+        index = faiss.IndexHNSWSQ(self._dim, faiss.ScalarQuantizer.QT_8bit, self._hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = self.hnsw_ef_construction
+        index.hnsw.efSearch = self.hnsw_ef_search
+        index.train(train_vectors)
+        return index
+
+    def _build_index(self):
+        """Build a fresh index over every row of the vector matrix, quantized once it is large enough."""
+        vectors = self._vectors[: self._n]
+        if self._quantize and self._n >= self._sq_min_vectors:
+            index = self._create_sq_index(vectors)
+        else:
+            index = self._create_hnsw_index()
+        if self._n:
+            index.add(vectors)
+        return index
+
+    def _maybe_quantize(self) -> None:
+        """Swap the fp32 graph for IndexHNSWSQ once enough vectors exist to train it. Caller holds the lock."""
+        if (
+            self._quantize
+            and self._n >= self._sq_min_vectors
+            and not isinstance(self._index, faiss.IndexHNSWSQ)
+        ):
+            logger.info(f"[{self.workspace}] FAISS image: quantizing {self._n} vectors to int8 HNSW-SQ.")
+            self._index = self._build_index()
     
     def initialize(self):
         # step: check if index file exists
@@ -76,22 +213,63 @@ class FaissImageStorage(BaseVectorStorage):
                     logger.warning(
                         f"[{self.workspace}] FAISS index dim mismatch ({self._index.d} != {self._dim}), reinitializing."
                     )
-                if self._metadata_file.exists():
+                if self._meta_pack_file.exists() and self._vectors_file.exists():
+                    self._id_to_meta = msgpack.unpackb(
+                        self._meta_pack_file.read_bytes(), raw=False, strict_map_key=False
+                    ) or {}
+                    # read into memory, the file is rewritten in place on the next save
+                    self._set_vectors(np.load(self._vectors_file))
+                elif self._metadata_file.exists():
                     # load metadata
                     with open(self._metadata_file, "r", encoding="utf-8") as f:
                         stored_dict = json.load(f) or {}
                     self._id_to_meta = {int(fid): meta for fid, meta in stored_dict.items()}
+                    # move the per-meta vector lists into the matrix
+                    self._set_vectors(np.array(
+                        [self._id_to_meta[fid].pop("__vector__") for fid in sorted(self._id_to_meta)],
+                        dtype="float32",
+                    ).reshape(-1, self._dim))
                 else:
                     self._id_to_meta = {}
+                    self._set_vectors(np.empty((0, self._dim), dtype="float32"))
+                self._custom_to_faiss = {meta["__id__"]: fid for fid, meta in self._id_to_meta.items()}
+                self._sig_to_custom = {
+                    tuple(meta["__file_sig__"]): meta["__id__"]
+                    for meta in self._id_to_meta.values() if "__file_sig__" in meta
+                }
+                # rows without metadata are tombstones left by deletes since the last compaction
+                self._tombstones = set(range(self._index.ntotal)) - self._id_to_meta.keys()
                 logger.info(f"[{self.workspace}] images FAISS index and metadata loaded successfully.")
             except Exception as e:  # pragma: no cover - defensive load
                 logger.error(f"[{self.workspace}] Error loading FAISS index or metadata: {e}")
                 logger.warning(f"[{self.workspace}] Initializing empty FAISS index and metadata.")
                 self._index = self._create_hnsw_index()
                 self._id_to_meta = {}
+                self._custom_to_faiss = {}
+                self._sig_to_custom = {}
+                self._set_vectors(np.empty((0, self._dim), dtype="float32"))
+                self._tombstones = set()
         else:
             self._index = self._create_hnsw_index()
             self._id_to_meta = {}
+            self._custom_to_faiss = {}
+            self._sig_to_custom = {}
+            self._set_vectors(np.empty((0, self._dim), dtype="float32"))
+            self._tombstones = set()
+
+    def _set_vectors(self, vectors: np.ndarray) -> None:
+        self._vectors = np.ascontiguousarray(vectors, dtype="float32")
+        self._n = len(self._vectors)
+
+    def _append_vectors(self, vectors: np.ndarray) -> None:
+        """Append rows to the vector matrix, growing its capacity by 1.5x when full."""
+        need = self._n + len(vectors)
+        if need > len(self._vectors):
+            grown = np.empty((max(need, int(len(self._vectors) * 1.5)), self._dim), dtype="float32")
+            grown[: self._n] = self._vectors[: self._n]
+            self._vectors = grown
+        self._vectors[self._n : need] = vectors
+        self._n = need
             
     # for async safe
     async def get_index(self):
@@ -103,44 +281,80 @@ class FaissImageStorage(BaseVectorStorage):
         self.workspace_dir.mkdir(parents=True, exist_ok=True)
         faiss.write_index(self._index, str(self._faiss_index_file))
         
-        # str key for safety json
-        box = {str(fid): meta for fid, meta in self._id_to_meta.items()}
-        with open(self._metadata_file, "w", encoding="utf-8") as f:
-            json.dump(box, f, ensure_ascii=False, indent=2)
+        # faiss ids are 0..n-1, so row fid of the matrix is the vector of faiss id fid
+        with open(self._vectors_file, "wb") as f:
+            np.save(f, self._vectors[: self._n])
+        self._meta_pack_file.write_bytes(msgpack.packb(self._id_to_meta, use_bin_type=True))
+        # drop the legacy JSON once the new pair is written so it is never read stale
+        if self._metadata_file.exists():
+            os.remove(self._metadata_file)
+        self._dirty = False
+        self._last_save = time.time()
+
+    def _maybe_save(self) -> None:
+        """Mark the store dirty and save only if the last save is older than the interval. Caller holds the lock."""
+        self._dirty = True
+        if time.time() - self._last_save > self._save_interval:
+            self.save_faiss_index()
     
     
     def _find_faiss_id(self, custom_id):
-        for fid, meta in self._id_to_meta.items():
-            if meta.get("__id__") == custom_id:
-                return fid
-        return None
+        return self._custom_to_faiss.get(custom_id)
     
-    async def _remove_fasii_by_id(self, id: List[int]):
-        keep = [fid for fid in self._id_to_meta.keys() if fid not in id]
+    def _tombstone(self, id: List[int]) -> None:
+        """Drop faiss ids from the metadata and leave their vectors in the graph. Caller holds the lock."""
+        for fid in id:
+            meta = self._id_to_meta.pop(fid, None)
+            if meta is not None:
+                self._custom_to_faiss.pop(meta["__id__"], None)
+                sig = tuple(meta.get("__file_sig__", ()))
+                if self._sig_to_custom.get(sig) == meta["__id__"]:
+                    del self._sig_to_custom[sig]
+            self._tombstones.add(fid)
+        if len(self._tombstones) > self._compact_ratio * max(self._index.ntotal, 1):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rebuild the HNSW index from the live vectors only, clearing tombstones. Caller holds the lock."""
+        keep = list(self._id_to_meta.keys())
         
-        vector_keep = []
         new_id_to_meta = {}
+        new_custom_to_faiss = {}
         
         # when update faiss index we need fetch original vector from keep box
         # then initial index add all vector in to index
         for new_id, old_fid in enumerate(keep):
             vector_meta = self._id_to_meta[old_fid]
-            vector_keep.append(vector_meta["__vector__"])
             new_id_to_meta[new_id] = vector_meta
+            new_custom_to_faiss[vector_meta["__id__"]] = new_id
+        # one fancy-index gather of the surviving rows, already normalized on insert
+        self._set_vectors(self._vectors[np.asarray(keep, dtype="int64")])
 
-
-        async with self.lock:
-            self._index = self._create_hnsw_index()
-            if vector_keep:
-                arr = np.array(vector_keep, dtype="float32")
-                faiss.normalize_L2(arr)
-                self._index.add(arr)
-            
-            self._id_to_meta = new_id_to_meta
-            self.save_faiss_index()
-            
+        self._index = self._build_index()
         
+        self._id_to_meta = new_id_to_meta
+        self._custom_to_faiss = new_custom_to_faiss
+        self._tombstones = set()
+            
     
+    async def _encode_into(self, out: np.ndarray, images: list, rows: list[int]) -> bool:
+        """Decode and CLIP-encode images[rows] into the matching rows of out, normalized."""
+        # decode every image on the decode pool, then push them through CLIP in one encode call
+        # so the ViT runs on large batches instead of one small call per 8 images
+        # SentenceTransformer image encoders can take PIL Images directly.
+        pil_images = await _decode_images([images[row] for row in rows])
+        # each embedding of a image in one row
+        embedding = np.asarray(await self.embedding_func(pil_images), dtype="float32")
+        if len(embedding) != len(rows):
+            logger.error(
+                f"[{self.workspace}] FAISS image: embedding length {len(embedding)} not match image length {len(rows)}"
+            )
+            return False
+        # faiss normalize is row-wise
+        faiss.normalize_L2(embedding)
+        out[rows] = embedding
+        return True
+
     async def upsert(self, data: dict[str, dict[str, Any]]):
         """
         Upsert embeddings into FAISS index.
@@ -168,63 +382,71 @@ class FaissImageStorage(BaseVectorStorage):
             meta = {mf: v[mf] for mf in self.meta_fields if mf in v}
             meta["__id__"] = i
             meta["created_at"] = current_time
+            sig = _file_sig(v["images"])
+            if sig is not None:
+                meta["__file_sig__"] = sig
             images.append(v["images"])
             meatadatas.append(meta)
-        
-        # add batch manipulate for handle images
-        batchs = [
-            images[i : i + self.embedding_batch] for i in range(0, len(images), self.embedding_batch)
-        ]
-        
-        embeddings_split: list[np.ndarray] = []
-        if batchs:
-            with tqdm(total=len(batchs), desc=f"[{self.workspace}] FAISS: inserting {self.namespace} index.", unit="batch") as pbar:
-                for batch_paths in batchs:
-                    # SentenceTransformer image encoders can take PIL Images directly.
-                    batch_images = [Image.open(p).convert("RGB") for p in batch_paths]
-                    # each embedding of a image in one row
-                    embedding = await self.embedding_func(batch_images)
-                    embedding = np.asarray(embedding, dtype="float32")
-                    # faiss normalize is row-wise
-                    faiss.normalize_L2(embedding)
-                    embeddings_split.append(embedding)
-                    pbar.update(1)
-
-        #flatten embedding to 2D for faiss add
-        all_embedding = np.concatenate(embeddings_split, axis=0) if embeddings_split else np.empty((0, self._dim), dtype="float32")
-
-        if len(all_embedding) != len(meatadatas):
-            logger.error(
-                f"[{self.workspace}] FAISS image: embedding length {len(all_embedding)} not match metadata length {len(meatadatas)}"
-            )
+
+        # a file whose (path, size, mtime) matches an indexed entry reuses that entry's vector;
+        # only the misses are decoded and sent through CLIP. The signature lives in the metadata,
+        # so the reuse survives restarts with no separate cache file. This probe is only a hint,
+        # the rows are resolved again under the lock
+        sigs = [tuple(meta.get("__file_sig__", ())) for meta in meatadatas]
+        all_embedding = np.empty((len(images), self._dim), dtype="float32")
+        misses = [row for row, sig in enumerate(sigs) if sig not in self._sig_to_custom]
+        if misses and not await self._encode_into(all_embedding, images, misses):
             return []
         
-        # update current storage remove duplicate
-        need_remove = []
-        for metas in meatadatas:
-            rm_faiss_id = self._find_faiss_id(metas["__id__"])
-            if rm_faiss_id is not None:
-                need_remove.append(rm_faiss_id)
-        
-        if need_remove:
-            await self._remove_fasii_by_id(need_remove)
-            
         # insert new embedding to faiss
         async with self.lock:
+            # copy reused vectors before tombstoning, which may compact and move rows; an entry
+            # deleted while the misses were encoding is encoded here instead
+            missed = set(misses)
+            stale = []
+            for row, sig in enumerate(sigs):
+                if row in missed:
+                    continue
+                fid = self._custom_to_faiss.get(self._sig_to_custom.get(sig))
+                if fid is None:
+                    stale.append(row)
+                else:
+                    all_embedding[row] = self._vectors[fid]
+            if stale and not await self._encode_into(all_embedding, images, stale):
+                return []
+            logger.debug(
+                f"[{self.workspace}] FAISS image: reused {len(images) - len(misses) - len(stale)} embeddings, "
+                f"encoded {len(misses) + len(stale)}"
+            )
+
+            # update current storage remove duplicate; looked up under the lock because a
+            # compaction by another writer renumbers every faiss id
+            # dict_keys & list intersects in C; only the replaced ids are looked up afterwards
+            replaced = self._custom_to_faiss.keys() & [m["__id__"] for m in meatadatas]
+            need_remove = [self._custom_to_faiss[cid] for cid in replaced]
+            # replaced ids become tombstones in the same locked section, no graph rebuild
+            if need_remove:
+                self._tombstone(need_remove)
             # async safety load index
             index = await self.get_index()
             # insert in the end of index fro meta collection
             start = index.ntotal
             if len(all_embedding):
                 index.add(all_embedding)
+                self._append_vectors(all_embedding)
+                self._maybe_quantize()
             
         # UPDATE META
         # the mertadatas is the data we need updata not include old data
             for i, meta in enumerate(meatadatas):
                 faiss_id = start + i   
-                meta["__vector__"] = all_embedding[i].tolist()
                 self._id_to_meta.update({faiss_id: meta})
-            self.save_faiss_index()
+                self._custom_to_faiss[meta["__id__"]] = faiss_id
+                if "__file_sig__" in meta:
+                    self._sig_to_custom[tuple(meta["__file_sig__"])] = meta["__id__"]
+            self._clear_proximity()
+            _resolve_path.cache_clear()
+            self._maybe_save()
         
         logger.debug(f"[{self.workspace}] FAISS: inserted {len(data)} vectors into {self.namespace} index.")
         
@@ -233,44 +455,7 @@ class FaissImageStorage(BaseVectorStorage):
     
     def _resolve_path(self, path: str) -> str:
         """Helper to resolve paths that might be from a different OS."""
-        if not path:
-            return ""
-        
-        # Helper to get safe filename from potential Windows path on Linux
-        def _get_safe_name(p: str) -> str:
-            s = str(p)
-            if "\\" in s:
-                return s.split("\\")[-1]
-            return Path(s).name
-
-        p = Path(path)
-        if p.exists():
-            return str(p.resolve())
-        
-        # Try finding in standard locations relative to this file
-        # __file__ is agent/tool/local_search/RAG/image_faiss_build.py
-        # pdf_pro is agent/tool/local_search/pdf_pro
-        try:
-            base_dir = Path(__file__).resolve().parent.parent / "pdf_pro"
-            if not base_dir.exists():
-                return path
-
-            filename = _get_safe_name(path)
-            
-            # Try images folder
-            candidate = base_dir / "images" / filename
-            if candidate.exists():
-                return str(candidate.resolve())
-            
-            # Try texts folder
-            candidate = base_dir / "texts" / filename
-            if candidate.exists():
-                return str(candidate.resolve())
-                
-        except Exception:
-            pass
-            
-        return path
+        return _resolve_path(path)
 
     async def query(
         self,
@@ -279,86 +464,147 @@ class FaissImageStorage(BaseVectorStorage):
         top_k: int = 10,
         query_embedding: list[float] | None = None,
     ):
-        # Build a query embedding from explicit vector, images, or text (for CLIP text->image search).
-        if query_embedding is not None:
-            embedding = np.array([query_embedding], dtype="float32")
-        elif images:
-            batch_images = [Image.open(p).convert("RGB") for p in images]
-            embedding = await self.embedding_func(batch_images)
-            embedding = np.asarray(embedding, dtype="float32")
-        elif text:
-            embedding = await self.embedding_func([text])
-            embedding = np.asarray(embedding, dtype="float32")
+        # repeat queries reuse the normalized embedding instead of another CLIP forward pass;
+        # image queries are keyed on path + mtime so an edited file is re-encoded
+        key = None
+        if query_embedding is None:
+            if images:
+                key = ("images", tuple((p, os.stat(p).st_mtime_ns) for p in images))
+            elif text:
+                key = ("text", hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+        embedding = self._query_emb_cache.get(key) if key is not None else None
+
+        if embedding is not None:
+            self._query_emb_cache.move_to_end(key)
         else:
-            return []
-
-        faiss.normalize_L2(embedding)
+            # Build a query embedding from explicit vector, images, or text (for CLIP text->image search).
+            if query_embedding is not None:
+                # private copy: normalize_L2 works in place and must not touch the caller's array
+                embedding = np.asarray(query_embedding, dtype="float32").reshape(1, -1).copy()
+            elif images:
+                batch_images = await _decode_images(images)
+                embedding = await self.embedding_func(batch_images)
+                embedding = np.asarray(embedding, dtype="float32")
+            elif text:
+                embedding = await self.embedding_func([text])
+                embedding = np.asarray(embedding, dtype="float32")
+            else:
+                return []
+
+            faiss.normalize_L2(embedding)
+            if key is not None:
+                self._query_emb_cache[key] = embedding
+                if len(self._query_emb_cache) > self._query_emb_cache_size:
+                    self._query_emb_cache.popitem(last=False)
+
+        hit = self._proximity_lookup(embedding[0], top_k)
+        if hit is not None:
+            return hit
 
         index = await self.get_index()
-        distance, indices = index.search(embedding, k=top_k)
+        # over-fetch so tombstoned hits do not leave the result short
+        k = min(top_k + len(self._tombstones), max(index.ntotal, 1))
+        distance, indices = index.search(embedding, k=k)
 
         results = []
         if len(distance) == 0:
             return results
 
-        for dist, idx in zip(distance[0], indices[0]):
-            if idx == -1 or dist < self.threshold:
+        # drop padding and below-threshold hits in one vectorized pass, then walk only the survivors
+        mask = (indices[0] != -1) & (distance[0] >= self.threshold)
+        tombstones = self._tombstones
+        for dist, idx in zip(distance[0][mask].tolist(), indices[0][mask].tolist()):
+            if idx in tombstones:
                 continue
+            if len(results) >= top_k:
+                break
 
-            meta = self._id_to_meta.get(int(idx), {})
-            filtered_meta = {k: v for k, v in meta.items() if k != "__vector__"}
+            meta = self._id_to_meta.get(idx, {})
+            filtered_meta = dict(meta)
+            filtered_meta.pop("__file_sig__", None)
             
             # Resolve paths
             if "image_path" in filtered_meta:
-                filtered_meta["image_path"] = self._resolve_path(filtered_meta["image_path"])
+                filtered_meta["image_path"] = _resolve_path(filtered_meta["image_path"])
             if "source_path" in filtered_meta:
-                filtered_meta["source_path"] = self._resolve_path(filtered_meta["source_path"])
+                filtered_meta["source_path"] = _resolve_path(filtered_meta["source_path"])
                 
-            results.append({
-                **filtered_meta,
-                "id": meta.get("__id__", ""),
-                "distance": float(dist),
-                "created_at": meta.get("created_at", 0),
-            })
+            filtered_meta["id"] = meta.get("__id__", "")
+            filtered_meta["distance"] = dist
+            filtered_meta["created_at"] = meta.get("created_at", 0)
+            results.append(filtered_meta)
+        self._proximity_insert(embedding[0], top_k, results)
         return results
 
+    def _proximity_lookup(self, vector: np.ndarray, top_k: int) -> Optional[list[dict[str, Any]]]:
+        """Return copies of cached results for a near-identical earlier query with at least top_k."""
+        n = len(self._proximity_entries)
+        if not n:
+            return None
+        sims = self._proximity_mat[:n] @ vector
+        best = int(np.argmax(sims))
+        cached_k, results = self._proximity_entries[best]
+        if sims[best] < 1 - self._proximity_tau or cached_k < top_k:
+            return None
+        return [dict(r) for r in results[:top_k]]
+
+    def _proximity_insert(self, vector: np.ndarray, top_k: int, results: list[dict[str, Any]]) -> None:
+        """Store a query's results, overwriting the oldest slot once the cache is full."""
+        slot = self._proximity_next
+        self._proximity_mat[slot] = vector
+        entry = (top_k, [dict(r) for r in results])
+        if slot < len(self._proximity_entries):
+            self._proximity_entries[slot] = entry
+        else:
+            self._proximity_entries.append(entry)
+        self._proximity_next = (slot + 1) % self._proximity_size
+
+    def _clear_proximity(self) -> None:
+        self._proximity_entries = []
+        self._proximity_next = 0
+
     async def index_done_callback(self) -> None:
         async with self.lock:
-            self.save_faiss_index()
+            if self._dirty:
+                self.save_faiss_index()
 
-    async def get_by_id(self, id: str):
-        fid = self._find_faiss_id(id)
+    async def finalize(self):
+        # persist anything the debounced saves skipped
+        await self.index_done_callback()
+
+    def _record(self, id: str) -> dict[str, Any] | None:
+        """Build the public record for one custom id, or None when it is unknown."""
+        fid = self._custom_to_faiss.get(id)
         if fid is None:
             return None
 
-        metadata = self._id_to_meta.get(fid, {})
+        metadata = self._id_to_meta.get(fid)
         if not metadata:
             return None
 
-        filtered_meta = {k: v for k, v in metadata.items() if k != "__vector__"}
+        filtered_meta = dict(metadata)
+        filtered_meta.pop("__file_sig__", None)
         
         # Resolve paths
         if "image_path" in filtered_meta:
-            filtered_meta["image_path"] = self._resolve_path(filtered_meta["image_path"])
+            filtered_meta["image_path"] = _resolve_path(filtered_meta["image_path"])
         if "source_path" in filtered_meta:
-            filtered_meta["source_path"] = self._resolve_path(filtered_meta["source_path"])
+            filtered_meta["source_path"] = _resolve_path(filtered_meta["source_path"])
 
-        return {
-            **filtered_meta,
-            "id": metadata.get("__id__", ""),
-            "created_at": metadata.get("created_at", 0),
-        }
+        filtered_meta["id"] = metadata.get("__id__", "")
+        filtered_meta["created_at"] = metadata.get("created_at", 0)
+        return filtered_meta
+
+    async def get_by_id(self, id: str):
+        return self._record(id)
 
     async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
         if not ids:
             return []
 
-        results: list[dict[str, Any] | None] = []
-        for id in ids:
-            record = await self.get_by_id(id)
-            results.append(record)
-
-        return results
+        # one synchronous pass, no per-id coroutine
+        record = self._record
+        return [record(id) for id in ids]
 
     async def get_vectors_by_ids(self, ids: list[str]) -> dict[str, list[float]]:
         if not ids:
@@ -368,32 +614,36 @@ class FaissImageStorage(BaseVectorStorage):
         for id in ids:
             fid = self._find_faiss_id(id)
             if fid is not None and fid in self._id_to_meta:
-                metadata = self._id_to_meta[fid]
-                if "__vector__" in metadata:
-                    vectors_dict[id] = metadata["__vector__"]
+                vectors_dict[id] = self._vectors[fid].tolist()
 
         return vectors_dict
 
     async def delete(self, ids: list[str]):
-        to_remove = []
-        for cid in ids:
-            faiss_id = self._find_faiss_id(cid)
-            if faiss_id is not None:
-                to_remove.append(faiss_id)
-
-        if to_remove:
-            await self._remove_fasii_by_id(to_remove)
+        async with self.lock:
+            # resolved under the lock, a concurrent compaction renumbers faiss ids
+            to_remove = [self._custom_to_faiss[cid] for cid in self._custom_to_faiss.keys() & ids]
+            if to_remove:
+                self._tombstone(to_remove)
+                self._clear_proximity()
+                self._maybe_save()
 
     async def drop(self) -> dict[str, str]:
         try:
             async with self.lock:
                 self._index = self._create_hnsw_index()
                 self._id_to_meta = {}
+                self._custom_to_faiss = {}
+                self._sig_to_custom = {}
+                self._set_vectors(np.empty((0, self._dim), dtype="float32"))
+                self._tombstones = set()
+                self._clear_proximity()
+                self._dirty = False
 
                 if self._faiss_index_file.exists():
                     os.remove(self._faiss_index_file)
-                if self._metadata_file.exists():
-                    os.remove(self._metadata_file)
+                for path in (self._metadata_file, self._meta_pack_file, self._vectors_file):
+                    if path.exists():
+                        os.remove(path)
 
             logger.info(f"[{self.workspace}] Process {os.getpid()} drop FAISS index {self.namespace}")
             return {"status": "success", "message": "data dropped"}
@@ -1,37 +1,75 @@
 from __future__ import annotations
 import asyncio
+import functools
+import hashlib
 import os
 import time
 import threading
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, List
-import json
+from typing import TYPE_CHECKING, Any, List
+import orjson
 import numpy as np
-import torch
-from torch.amp import autocast_mode
-from sentence_transformers import SentenceTransformer
 from .base import EmbeddingFunc
 from .faiss_build import FaissVectorStorage
 from .image_faiss_build import FaissImageStorage
 from .kv_storage import KVStorage
 from .....log.logger import logger
 from .tokenizer import TiktokenTokenizer
+from .chunking import chunk_text, chunk_file, chunk_pool, prune_chunk_cache
+from .embedding_cache import EmbeddingCache
 from ..data_process import local_doc_process, _move_to_save
 
+# torch and sentence_transformers take seconds to import, load them only when a model is needed
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional speedup
+    uvloop = None
+
+
+def run_async(coro):
+    """Run a coroutine on a fresh loop, using uvloop when it is installed."""
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
 
 def _resolve_device() -> str:
-    """Prefer CUDA when available unless forced to CPU or running CPU-only in Docker."""
+    """Prefer CUDA, then Apple MPS, unless forced to CPU or running CPU-only in Docker."""
     force_cpu = os.environ.get("RAG_FORCE_CPU", "").lower() in {"1", "true", "yes"}
 
     if force_cpu:
         return "cpu"
+    import torch
+
     if torch.cuda.is_available():
         return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
     # In Docker without visible GPUs, stay on CPU explicitly.
     return "cpu"
 
 
+@functools.lru_cache(maxsize=None)
+def _device() -> str:
+    # probe once per process, on first use rather than at import
+    return _resolve_device()
+
+
+def _max_seq_length() -> int | None:
+    """Optional RAG_MAX_SEQ_LENGTH cap, bge-m3 otherwise allows 8192 tokens per text."""
+    value = os.getenv("RAG_MAX_SEQ_LENGTH")
+    try:
+        return int(value) if value else None
+    except ValueError:
+        logger.warning(f"[vanilla-rag] Invalid RAG_MAX_SEQ_LENGTH={value}, ignored.")
+        return None
+
+
 class _BgeM3Embedder:
     """Thread-safe wrapper around the SentenceTransformer model."""
 
@@ -39,32 +77,72 @@ class _BgeM3Embedder:
         self.model_name = model_name
         self._model: SentenceTransformer | None = None
         self._load_lock = asyncio.Lock()
-        self.device = _resolve_device()
+        batch_env = os.getenv("RAG_ENCODE_BATCH_SIZE")
+        try:
+            self.batch_size = max(1, int(batch_env)) if batch_env else 16
+        except ValueError:
+            logger.warning(f"[{self.model_name}] Invalid RAG_ENCODE_BATCH_SIZE={batch_env}, fallback to 16.")
+            self.batch_size = 16
+        # opt-in: int8 vectors differ slightly from fp32 ones, so an existing index should be rebuilt
+        # e.g. RAG_CPU_ONNX_FILE=onnx/model_qint8_avx512_vnni.onnx
+        self.onnx_file = os.getenv("RAG_CPU_ONNX_FILE")
+
+    @property
+    def device(self) -> str:
+        return _device()
 
     async def _ensure_model(self):
-        if self._model is None:
-            async with self._load_lock:
-                loop = asyncio.get_running_loop()
-
-                def _load():
-                    logger.info(f"Loading model {self.model_name}")
-                    return SentenceTransformer(self.model_name, device=self.device)
-
-                self._model = await loop.run_in_executor(None, _load)
+        if self._model is not None:
+            return
+        async with self._load_lock:
+            # re-check under the lock so concurrent callers don't load the model twice
+            if self._model is not None:
+                return
+            loop = asyncio.get_running_loop()
+
+            def _load():
+                from sentence_transformers import SentenceTransformer
+
+                logger.info(f"Loading model {self.model_name}")
+                if self.device == "cpu" and self.onnx_file:
+                    try:
+                        # int8 ONNX graph via the SentenceTransformer onnx backend (needs optimum)
+                        return SentenceTransformer(
+                            self.model_name,
+                            device=self.device,
+                            backend="onnx",
+                            model_kwargs={"file_name": self.onnx_file},
+                        )
+                    except Exception as exc:
+                        logger.warning(f"[{self.model_name}] ONNX load of {self.onnx_file} failed, fallback to torch: {exc}")
+                return SentenceTransformer(self.model_name, device=self.device)
+
+            model = await loop.run_in_executor(None, _load)
+            if self.device == "cuda":
+                # fp16 weights halve GPU memory and run on tensor cores, vectors are normalised in fp32 later
+                model.half()
+            max_seq_length = _max_seq_length()
+            if max_seq_length:
+                model.max_seq_length = max_seq_length
+            self._model = model
 
     async def encode(self, texts: List[str]) -> np.ndarray:
         await self._ensure_model()
-        assert self._model is not None
+        import torch
+
         loop = asyncio.get_running_loop()
 
+        # no autograd bookkeeping for pure inference
+        @torch.inference_mode()
         def _encode():
             if self.device == "cuda":
-                with autocast_mode.autocast("cuda"):
-                    out = self._model.encode(texts, normalize_embeddings=False, batch_size=16, convert_to_numpy=True)
+                with torch.autocast("cuda"):
+                    out = self._model.encode(texts, normalize_embeddings=False, batch_size=self.batch_size, convert_to_numpy=True, show_progress_bar=False)
             else:
-                logger.warning(f"[{self.model_name}]using cpu mode")
-                out = self._model.encode(texts, normalize_embeddings=False, batch_size=16, convert_to_numpy=True)
-            return out.astype("float32")
+                logger.warning(f"[{self.model_name}]using {self.device} mode")
+                out = self._model.encode(texts, normalize_embeddings=False, batch_size=self.batch_size, convert_to_numpy=True, show_progress_bar=False)
+            # encode returns a fresh array, only copy when autocast left it in fp16
+            return out.astype("float32", copy=False)
                     
 
         return await loop.run_in_executor(None, _encode)
@@ -76,31 +154,47 @@ class clipembedder:
         self.model_name = model_name
         self._model: SentenceTransformer | None = None
         self.lock = asyncio.Lock()
-        self.device = _resolve_device()
+
+    @property
+    def device(self) -> str:
+        return _device()
     
     async def initial(self):
-        if self._model is None:
-            async with self.lock:
-                loop = asyncio.get_running_loop()
-                def _load():
-                    logger.info(f"Loading model {self.model_name}")
-                    # Some SentenceTransformer versions do not accept use_fast
-                    return SentenceTransformer(self.model_name, device=self.device)
-                self._model = await loop.run_in_executor(None, _load)
+        if self._model is not None:
+            return
+        async with self.lock:
+            # re-check under the lock so warmup and first query don't both load
+            if self._model is not None:
+                return
+            loop = asyncio.get_running_loop()
+            def _load():
+                from sentence_transformers import SentenceTransformer
+
+                logger.info(f"Loading model {self.model_name}")
+                # Some SentenceTransformer versions do not accept use_fast
+                return SentenceTransformer(self.model_name, device=self.device)
+            model = await loop.run_in_executor(None, _load)
+            if self.device == "cuda":
+                model.half()
+            self._model = model
                 
                 
     async def _encode(self, image) -> np.ndarray:
         await self.initial()
+        import torch
+
         loop = asyncio.get_running_loop()
         
+        @torch.inference_mode()
         def encode():
             if self.device == "cuda":
-                with autocast_mode.autocast("cuda"):
-                    out = self._model.encode(image, normalize_embeddings=False, batch_size=16, convert_to_numpy=True)
+                with torch.autocast("cuda"):
+                    out = self._model.encode(image, normalize_embeddings=False, batch_size=64, convert_to_numpy=True)
             else:
-                logger.warning(f"[{self.model_name}]using cpu mode")
-                out = self._model.encode(image, normalize_embeddings=False, batch_size=16, convert_to_numpy=True)
-            return out.astype("float32")
+                logger.warning(f"[{self.model_name}]using {self.device} mode")
+                out = self._model.encode(image, normalize_embeddings=False, batch_size=64, convert_to_numpy=True)
+            # encode returns a fresh array, only copy when autocast left it in fp16
+            return out.astype("float32", copy=False)
         return await loop.run_in_executor(None, encode)
             
 
@@ -109,8 +203,36 @@ class clipembedder:
 _EMBEDDER = _BgeM3Embedder()
 _IMAGE_EMBEDDER = clipembedder()
 
+@functools.lru_cache(maxsize=None)
+def _embedding_cache() -> EmbeddingCache:
+    # built on first use: the key depends on the device, which would import torch at module load
+    # the int8 onnx graph gives slightly different vectors, keep its cache entries apart
+    use_onnx = _EMBEDDER.onnx_file and _EMBEDDER.device == "cpu"
+    return EmbeddingCache(
+        Path(".") / "rag_cache" / "embedding_cache.sqlite",
+        f"{_EMBEDDER.model_name}@{_EMBEDDER.onnx_file}" if use_onnx else _EMBEDDER.model_name,
+    )
+
 async def _embedding_func(texts: List[str], embedding_dim: int = 1024, **_) -> np.ndarray:
-    vectors = await _EMBEDDER.encode(texts)
+    # only send texts the content-hash cache hasn't seen to the encoder
+    cache = _embedding_cache()
+    keys = [cache.key(text) for text in texts]
+    cached = cache.get_many(keys)
+    misses = [i for i, key in enumerate(keys) if key not in cached]
+
+    fresh = None
+    if misses:
+        fresh = await _EMBEDDER.encode([texts[i] for i in misses])
+        cache.set_many(zip((keys[i] for i in misses), fresh))
+
+    dim = fresh.shape[1] if fresh is not None else embedding_dim
+    vectors = np.empty((len(texts), dim), dtype="float32")
+    for i, key in enumerate(keys):
+        hit = cached.get(key)
+        if hit is not None:
+            vectors[i] = hit
+    if fresh is not None:
+        vectors[misses] = fresh
     if vectors.shape[1] != embedding_dim:
         logger.warning(
             "[vanilla-rag] embedding dimension mismatch %s != %s",
@@ -220,56 +342,62 @@ class VanillaRAG:
         only_character: bool = False,
         chunk_overlap: int = 100,
         chunk_token_size = 1200,
-        ) -> list[str]:
-
-        # chunk content by the token size or character
-        token = self.tokenizer.encode(content)
-        #logger.info(f"[process moniter] rm line144")
-        result: list[dict[str, Any]] = []
-        if split_by_character:
-            chunks = content.split(split_by_character)
-            new_chunk = []
-            if only_character:
-                for chunk in chunks:
-                    new_chunk.append((len(chunk.strip()), chunk))
-            else:
-                # reguler with token size 
-                for chunk in chunks:
-                    chunk_token = self.tokenizer.encode(chunk)
-                    if len(chunk_token) > chunk_token_size:
-                        for start in range(
-                            0, len(chunk_token), chunk_token_size - chunk_overlap
-                        ):
-                            chunk_content = self.tokenizer.decode(
-                                chunk_token[start : start + chunk_token_size]
-                            )
-                            new_chunk.append((min(chunk_token_size, len(chunk_token) - start), chunk_content))
-                            
-                    else:
-                        new_chunk.append((len(chunk_token), chunk))
-            for index, (length, chunk) in enumerate(new_chunk):
-                result.append({
-                    "content": chunk.strip(),
-                    "chunk_length": length,
-                    "chunk_index": index
-                })
-                
-        else:
-            for start in range(0, len(token), chunk_token_size - chunk_overlap):
-                chunk_content = self.tokenizer.decode(
-                    token[start : start + chunk_token_size]
-                )
-                result.append({
-                    "content": chunk_content.strip(),
-                    "chunk_length": min(chunk_token_size, len(token[start : start + chunk_token_size])),
-                    "chunk_index": start
-                })
-        #logger.info(f"[process moniter] rm line184")
-        return result
+        ) -> list[dict[str, Any]]:
+        return chunk_text(
+            self.tokenizer,
+            content,
+            split_by_character=split_by_character,
+            only_character=only_character,
+            chunk_overlap=chunk_overlap,
+            chunk_token_size=chunk_token_size,
+        )
+
+    async def _chunk_files(
+        self, files: list[Path], texts: dict[Path, str] | None = None
+    ) -> list[tuple[Path, list[dict[str, Any]]]]:
+        """Chunk files across a process pool, keeping input order; texts already in memory skip the disk read."""
+        texts = texts or {}
+        # drop cache entries no rebuild has used for a while before adding new ones
+        await asyncio.to_thread(prune_chunk_cache)
+        if len(files) <= 1:
+            return [await asyncio.to_thread(chunk_file, file, texts.get(file)) for file in files]
+
+        loop = asyncio.get_running_loop()
+        pool = chunk_pool()
+        return await asyncio.gather(
+            *(loop.run_in_executor(pool, chunk_file, file, texts.get(file)) for file in files)
+        )
+
+    async def _drop_unchanged_chunks(
+        self,
+        vector_payload: dict[str, dict[str, Any]],
+        kv_payload: dict[str, dict[str, Any]],
+    ) -> int:
+        """Remove chunks from vector_payload whose stored content hash matches, return how many."""
+        if not vector_payload:
+            return 0
+        indexed = {meta.get("__id__") for meta in self.vector_storage.client_storage["data"]}
+        if not indexed:
+            return 0
+
+        chunk_ids = list(vector_payload)
+        existing = await self.kv_storage.get_by_ids(chunk_ids)
+        skipped = 0
+        for chunk_id, record in zip(chunk_ids, existing):
+            if (
+                record
+                and chunk_id in indexed
+                and record.get("content_hash") == kv_payload[chunk_id]["content_hash"]
+            ):
+                del vector_payload[chunk_id]
+                skipped += 1
+        return skipped
 
     async def build_from_shards(self) -> dict[str, Any]:
         await self.initialize()
-        files, images = local_doc_process(self.update_dir)
+        # PDF parsing is blocking CPU work, keep it off the event loop so a background
+        # warmup build doesn't stall queries and embedding calls sharing the loop
+        files, images, texts = await asyncio.to_thread(local_doc_process, self.update_dir)
         if not files:
             return {"status": "error", "message": "no shard files found"}
 
@@ -278,7 +406,7 @@ class VanillaRAG:
         pdf_meta = {}
         if pdf_meta_path.exists():
             try:
-                pdf_meta = json.loads(pdf_meta_path.read_text(encoding="utf-8")) or {}
+                pdf_meta = orjson.loads(pdf_meta_path.read_bytes()) or {}
             except Exception as exc:  # pragma: no cover - defensive
                 logger.warning(f"[{self.workspace}] failed to load PDF metadata: {exc}")
 
@@ -351,30 +479,10 @@ class VanillaRAG:
         vector_payload: dict[str, dict[str, Any]] = {}
         image_payload: dict[str, dict[str, Any]] = {}
 
-        for file in files:
-            try:
-                #logger.info(f"[process moniter] rm line199")
-                # .read_test is path method
-                content = file.read_text(encoding="utf-8")
-            except UnicodeDecodeError:
-                content = file.read_text(encoding="utf-8", errors="ignore")
+        chunked_files = await self._chunk_files(files, texts)
 
+        for file, chunks in chunked_files:
             doc_id = file.stem
-            
-            #start = time.time()
-            # separate csv by the ine
-            if file.suffix.lower() == ".csv":
-                chunks = self._chunk_text(
-                    content,
-                    split_by_character="\n",
-                    only_character=True,
-                    chunk_overlap=0,
-                )
-            else:
-                # separate by the token size
-                chunks = self._chunk_text(content)
-            
-            #end = time.time()
 
             meta_from_pdf = text_meta_map.get(file.name)
             source_type = "pdf_text" if meta_from_pdf else "text"
@@ -400,6 +508,7 @@ class VanillaRAG:
                 kv_payload[chunk_id] = {
                     "content": chunk["content"],
                     "file_path": str(file),
+                    "content_hash": hashlib.blake2b(chunk["content"].encode("utf-8"), digest_size=16).hexdigest(),
                     **metadata,
                 }
                 vector_payload[chunk_id] = {
@@ -446,6 +555,11 @@ class VanillaRAG:
 
         if not vector_payload and not image_payload:
             return {"status": "error", "message": "no chunks generated"}
+        # skip re-embedding chunks whose content is unchanged and already in the index,
+        # this has to run before the KV upsert overwrites the stored hashes
+        skipped = await self._drop_unchanged_chunks(vector_payload, kv_payload)
+        if skipped:
+            logger.info(f"[{self.workspace}] {skipped} text chunks unchanged, skip embedding")
         #logger.info(f"[process moniter] rm line226")
         start1 = time.time()
         await self.kv_storage.upsert(kv_payload)
@@ -477,38 +591,34 @@ class VanillaRAG:
         # 3. if this text is not in the PDF those attribute is none
         # 4. when search query in FAISS the result will show if this text is in the PDF and is this PDF include images
         t0 = time.time()
-        hits = await self.vector_storage.query(query, top_k=top_k or self.top_k)
+        hits = await self.vector_storage.query_ids(query, top_k=top_k or self.top_k)
         t1 = time.time()
         logger.info(f"[{self.workspace}] Vector search took {t1 - t0:.3f}s")
         
-        if not hits:
+        if not len(hits["ids"]):
             return []
 
-        ids = [hit.get("id") for hit in hits if hit and hit.get("id")]
+        ids = hits["ids"].tolist()
         kv_records = await self.kv_storage.get_by_ids(ids)
         t2 = time.time()
         logger.info(f"[{self.workspace}] KV retrieval took {t2 - t1:.3f}s")
 
-        results = []
-        for hit, kv in zip(hits, kv_records):
-            if not kv:
-                continue
-            # fetch all image in this PDF
-            linked_images = kv.get("linked_images") or []
-            results.append(
-                {
-                    "id": hit.get("id"),
-                    "content": kv.get("content", ""),
-                    "source": kv.get("file_path") or kv.get("source_path"),
-                    "score": hit.get("distance", 0.0),
-                    "source_type": kv.get("source_type"),
-                    "pdf_name": kv.get("pdf_name"),
-                    "pdf_page": kv.get("pdf_page"),
-                    "linked_images": linked_images,
-                }
-            )
-        return results
-
+        # only build result dicts for hits that survived the KV lookup
+        return [
+            {
+                "id": hit_id,
+                "content": kv.get("content", ""),
+                "source": kv.get("file_path") or kv.get("source_path"),
+                "score": score,
+                "source_type": kv.get("source_type"),
+                "pdf_name": kv.get("pdf_name"),
+                "pdf_page": kv.get("pdf_page"),
+                # fetch all image in this PDF
+                "linked_images": kv.get("linked_images") or [],
+            }
+            for hit_id, score, kv in zip(ids, hits["distances"].tolist(), kv_records)
+            if kv
+        ]
 
 _DEFAULT_SERVICE = VanillaRAG()
 _warmup_lock = threading.Lock()
@@ -587,7 +697,7 @@ def warmup_vanilla_rag(auto_build: bool = False) -> asyncio.Task | None:
         loop = asyncio.get_running_loop()
     except RuntimeError:
         try:
-            asyncio.run(_runner())
+            run_async(_runner())
         finally:
             with _warmup_lock:
                 _warmup_in_progress = False
@@ -622,7 +732,7 @@ async def _cli_build():
 
 
 def main():
-    asyncio.run(_cli_build())
+    run_async(_cli_build())
 
 
 if __name__ == "__main__":
@@ -1,10 +1,83 @@
 from pathlib import Path
+import hashlib
+import multiprocessing
+import os
 import shutil
-import fitz
-import json
-import pdfplumber
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+import orjson
 from ....log.logger import logger
 
+# page extraction pool shared by every PDF of a run, started on first use
+_PAGE_POOL: ProcessPoolExecutor | None = None
+_PAGE_POOL_LOCK = threading.Lock()
+
+
+def _page_pool() -> ProcessPoolExecutor:
+    """Return the shared page extraction pool, starting it on first use."""
+    global _PAGE_POOL
+    with _PAGE_POOL_LOCK:
+        if _PAGE_POOL is None:
+            # reached from asyncio.to_thread in a process with torch loaded; forking a threaded
+            # process can deadlock the child, so workers come from forkserver / spawn instead
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _PAGE_POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context(method)
+            )
+        return _PAGE_POOL
+
+
+
+def _read_image_stream(doc, xref) -> tuple[bytes, str]:
+    """Return (bytes, ext) for an image xref, skipping the decode/re-encode where possible."""
+    import fitz
+
+    filt = doc.xref_get_key(xref, "Filter")[1]
+    # a plain JPEG stream is already a valid .jpeg file, copy the compressed bytes as-is
+    if filt == "/DCTDecode":
+        return doc.xref_stream_raw(xref), "jpeg"
+    if filt == "/FlateDecode":
+        pix = fitz.Pixmap(doc, xref)
+        # png can only hold gray / rgb, leave cmyk and friends to extract_image
+        if pix.colorspace is not None and pix.colorspace.n in (1, 3):
+            return pix.tobytes("png"), "png"
+    base_image = doc.extract_image(xref)
+    return base_image["image"], base_image["ext"]
+
+
+def _extract_images(doc, pdf_file: Path, out_dir: Path) -> list[dict]:
+    """Write every image of an already-open fitz document to out_dir and return its metadata."""
+    all_images = []
+    for page_index in range(len(doc)):
+        page = doc[page_index]
+        image_list = page.get_images(full=True)
+
+        for image_index, imag in enumerate(image_list, start=1):
+            xref = imag[0]
+            image_bytes, image_ext = _read_image_stream(doc, xref)
+
+            filename = f"{pdf_file.stem}-page-{page_index + 1}-image-{image_index}.{image_ext}"
+            out_path = out_dir / filename
+            out_path.write_bytes(image_bytes)
+
+            # Store relative path for portability
+            try:
+                # Calculate path relative to the work_dir (parent of out_dir)
+                # out_dir is work_dir/images, so out_dir.parent is work_dir
+                rel_path = out_path.relative_to(Path(out_dir).parent)
+            except ValueError:
+                rel_path = out_path.name
+
+            all_images.append({
+                "pdf": pdf_file.name,
+                "page": page_index + 1,
+                "image_id": f"{page_index + 1}-{image_index}",
+                "filename": str(rel_path).replace("\\", "/"),
+            })
+
+    return all_images
 
 
 def extract_image(pdf_path=None, out_dir="./pdf_pro/images"):
@@ -17,39 +90,58 @@ def extract_image(pdf_path=None, out_dir="./pdf_pro/images"):
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    all_images = []
+    import fitz
 
     with fitz.open(pdf_file) as doc:
-        for page_index in range(len(doc)):
-            page = doc[page_index]
-            image_list = page.get_images(full=True)
-
-            for image_index, imag in enumerate(image_list, start=1):
-                xref = imag[0]
-                base_image = doc.extract_image(xref)
-                image_bytes = base_image["image"]
-                image_ext = base_image["ext"]
-
-                filename = f"{pdf_file.stem}-page-{page_index + 1}-image-{image_index}.{image_ext}"
-                out_path = out_dir / filename
-                out_path.write_bytes(image_bytes)
-
-                # Store relative path for portability
-                try:
-                    # Calculate path relative to the work_dir (parent of out_dir)
-                    # out_dir is work_dir/images, so out_dir.parent is work_dir
-                    rel_path = out_path.relative_to(Path(out_dir).parent)
-                except ValueError:
-                    rel_path = out_path.name
-
-                all_images.append({
-                    "pdf": pdf_file.name,
-                    "page": page_index + 1,
-                    "image_id": f"{page_index + 1}-{image_index}",
-                    "filename": str(rel_path).replace("\\", "/"),
-                })
+        return _extract_images(doc, pdf_file, out_dir)
+
+
+def _page_tables(page, plumber_pdf, page_index: int) -> list:
+    # PyMuPDF >= 1.23 has a native table finder, older versions fall back to pdfplumber
+    if hasattr(page, "find_tables"):
+        return [table.extract() for table in page.find_tables().tables]
+
+    plumber_page = plumber_pdf().pages[page_index - 1]
+    # the default "lines" table strategy needs ruling edges, skip the finder without any
+    if not plumber_page.edges:
+        return []
+    return [table.extract() for table in plumber_page.find_tables()]
 
-    return all_images
+
+def _process_pages(pdf_file: Path, text_out_dir: Path, work_dir_path: Path, page_range: range) -> list:
+    # runs in a worker process: fitz documents are not picklable, so each worker opens the PDF
+    # once for its whole run of pages (and pdfplumber at most once, only when it is needed)
+    import fitz
+
+    pages = []
+    with ExitStack() as stack:
+        doc = stack.enter_context(fitz.open(pdf_file))
+        plumber = []
+
+        def plumber_pdf():
+            if not plumber:
+                import pdfplumber
+                plumber.append(stack.enter_context(pdfplumber.open(pdf_file)))
+            return plumber[0]
+
+        for page_index in page_range:
+            page = doc.load_page(page_index - 1)
+            text = page.get_text("text")
+            # pages without text (e.g. scanned images) skip the table finder entirely
+            sheet = _page_tables(page, plumber_pdf, page_index) if text.strip() else None
+
+            text_file = text_out_dir / f"{pdf_file.stem}-page-{page_index}.txt"
+            content = text
+            if sheet:
+                content = f"{text}\n\nTables:\n{orjson.dumps(sheet, option=orjson.OPT_INDENT_2).decode('utf-8')}"
+            text_file.write_text(content, encoding="utf-8")
+
+            pages.append((text_file, {
+                "pdf": pdf_file.name,
+                "page": page_index,
+                "filename": str(text_file.relative_to(work_dir_path)).replace("\\", "/"),
+            }, content))
+    return pages
 
 
 def extract_text_and_images(pdf_path=None, work_dir = "./pdf_pro"):
@@ -64,59 +156,130 @@ def extract_text_and_images(pdf_path=None, work_dir = "./pdf_pro"):
     text_out_dir.mkdir(parents=True, exist_ok=True)
     image_out_dir.mkdir(parents=True, exist_ok=True)
 
-    image_metadata = extract_image(pdf_path=pdf_file, out_dir=image_out_dir)
+    # unchanged PDFs reuse the previous extraction instead of being parsed again
+    manifest_file = work_dir_path / "_cache" / f"{_pdf_cache_key(pdf_file)}.json"
+    cached = _load_cached_extraction(manifest_file, work_dir_path)
+    if cached is not None:
+        text_paths, image_paths, texts, pdf_meta = cached
+        (work_dir_path / "PDF.json").write_bytes(orjson.dumps(pdf_meta, option=orjson.OPT_INDENT_2))
+        logger.info(f"reuse cached extraction of {pdf_file.name}")
+        return text_paths, image_paths, texts
 
-    text_metadata = []
-    text_paths: list[Path] = []
+    # fitz / pdfplumber are imported on demand so querying an existing index never loads them
+    import fitz
+
+    # one fitz parse serves the page count and all images
+    with fitz.open(pdf_file) as doc:
+        n_pages = len(doc)
+        image_metadata = _extract_images(doc, pdf_file, image_out_dir)
+
+    # pages are independent, so run text + table extraction across processes; each worker gets
+    # one contiguous run of pages, writes their text files and hands back metadata plus page text
+    workers = min(os.cpu_count() or 1, n_pages)
+    if workers > 1:
+        step = -(-n_pages // workers)
+        page_ranges = [range(start, min(start + step, n_pages + 1)) for start in range(1, n_pages + 1, step)]
+        pages = [
+            page
+            for chunk in _page_pool().map(partial(_process_pages, pdf_file, text_out_dir, work_dir_path), page_ranges)
+            for page in chunk
+        ]
+    else:
+        pages = _process_pages(pdf_file, text_out_dir, work_dir_path, range(1, n_pages + 1))
+
+    text_paths = [text_file for text_file, _, _ in pages]
+    text_metadata = [meta for _, meta, _ in pages]
+    # the page text is already in memory, return it so the caller need not re-read the files
+    texts = [content for _, _, content in pages]
     image_paths = [Path(img["filename"]) for img in image_metadata]
-    with pdfplumber.open(pdf_file) as pdf:
-        for page_index, page in enumerate(pdf.pages, start=1):
-            # Normalize layout to avoid pdfminer/pdfplumber tuple_iterator errors
-            if getattr(page, "layout", None) and hasattr(page.layout, "_objs"):
-                try:
-                    page.layout._objs = list(page.layout._objs)
-                except TypeError:
-                    page.layout._objs = list(page.layout)
 
-            try:
-                text = page.extract_text() or ""
-            except TypeError:
-                logger.warning("pdfplumber extract_text failed; falling back to fitz on page %s", page_index)
-                with fitz.open(pdf_file) as f:
-                    text = f.load_page(page_index - 1).get_text()
+    pdf_meta = {"image": image_metadata, "text": text_metadata}
+    (work_dir_path / "PDF.json").write_bytes(orjson.dumps(pdf_meta, option=orjson.OPT_INDENT_2))
 
-            sheet = page.extract_tables()
-            text_file = text_out_dir / f"{pdf_file.stem}-page-{page_index}.txt"
-            content = text
-            if sheet:
-                content = f"{text}\n\nTables:\n{json.dumps(sheet, ensure_ascii=False, indent=2)}"
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    # the manifest lands last and atomically, so its presence marks a complete extraction
+    tmp_file = manifest_file.with_suffix(f".{os.getpid()}.tmp")
+    tmp_file.write_bytes(orjson.dumps({**pdf_meta, "texts": texts}))
+    tmp_file.replace(manifest_file)
+    return text_paths, image_paths, texts
+
+
+def _pdf_cache_key(pdf_file: Path) -> str:
+    # output file names derive from the stem, so the same bytes under another name are a separate entry
+    with open(pdf_file, "rb") as f:
+        digest = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+    return f"{pdf_file.stem}-{digest}"
+
+
+def _load_cached_extraction(manifest_file: Path, work_dir_path: Path):
+    """Return (text_paths, image_paths, texts, pdf_meta) from a previous extraction, or None."""
+    if not manifest_file.exists():
+        return None
+    try:
+        manifest = orjson.loads(manifest_file.read_bytes())
+        text_metadata = manifest["text"]
+        image_metadata = manifest["image"]
+        texts = manifest["texts"]
+    except Exception:
+        # corrupt or older manifest, extract again
+        return None
+
+    # images are only referenced, if any went missing the PDF has to be extracted again
+    if not all((work_dir_path / img["filename"]).exists() for img in image_metadata):
+        return None
+
+    text_paths = []
+    for meta, content in zip(text_metadata, texts):
+        text_file = work_dir_path / meta["filename"]
+        if not text_file.exists():
+            # page text is kept in the manifest, so a removed text file is cheap to restore
             text_file.write_text(content, encoding="utf-8")
-            text_paths.append(text_file)
+        text_paths.append(text_file)
+    image_paths = [Path(img["filename"]) for img in image_metadata]
+    return text_paths, image_paths, texts, {"image": image_metadata, "text": text_metadata}
 
-            text_metadata.append({
-                "pdf": pdf_file.name,
-                "page": page_index,
-                "filename": str(text_file.relative_to(work_dir_path)).replace("\\", "/"),
-            })
+_COPY_BUFSIZE = 4 * 1024 * 1024
+
+
+def _copy_across_fs(src: Path, dest: Path) -> None:
+    """Move src to dest on another filesystem without bouncing bytes through Python."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                shutil.copystat(src, dest)
+                src.unlink()
+                return
+        except OSError:
+            # some filesystem pairs reject copy_file_range, use the buffered copy below
+            pass
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        shutil.copyfileobj(fsrc, fdst, _COPY_BUFSIZE)
+    shutil.copystat(src, dest)
+    src.unlink()
 
-    (work_dir_path / "PDF.json").write_text(json.dumps({"image": image_metadata, "text": text_metadata}, ensure_ascii=False, indent=2), encoding="utf-8")
-    return text_paths, image_paths
 
 # care if move path it will not work
 # current deprecated
 def _move_to_save(update_dir: Path, save_path: Path) -> None:
     """Move processed files from the update box into the main shard directory."""
     save_path.mkdir(parents=True, exist_ok=True)
-    for src in update_dir.glob("*"):
-        if not src.is_file():
-            continue
+    with os.scandir(update_dir) as it:
+        sources = [Path(entry.path) for entry in it if entry.is_file()]
+    for src in sources:
         dest = save_path / src.name
         try:
             dest.parent.mkdir(parents=True, exist_ok=True)
             src.replace(dest)  # overwrite existing
         except Exception:
-            # fall back to shutil in case replace fails across filesystems
-            shutil.move(str(src), str(dest))
+            # replace fails across filesystems, copy in-kernel then drop the source
+            _copy_across_fs(src, dest)
 
 
 def local_doc_process(update_dir: Path | None = None):
@@ -124,11 +287,11 @@ def local_doc_process(update_dir: Path | None = None):
     
     if not update_dir:
         logger.warning("no file need update")
-        return [], []
+        return [], [], {}
     update_path = Path(update_dir)
     if not update_path.exists():
         logger.warning("update path error")
-        return [], []
+        return [], [], {}
 
     pdf_work_dir = Path(__file__).resolve().parent / "pdf_pro"
     pdf_work_dir.mkdir(parents=True, exist_ok=True)
@@ -136,13 +299,18 @@ def local_doc_process(update_dir: Path | None = None):
     def _collect(shard_dir: Path):
         content: list[Path] = []
         images: list[Path] = []
-        for file in shard_dir.iterdir():
-            if not file.is_file():
-                continue
+        # extracted PDF page text keyed by its text file, chunked from memory later
+        texts: dict[Path, str] = {}
+        # one scandir sweep: DirEntry.is_file uses the d_type readdir already returned, no stat per file
+        with os.scandir(shard_dir) as it:
+            entries = sorted((entry for entry in it if entry.is_file()), key=lambda entry: entry.name)
+        for entry in entries:
+            file = Path(entry.path)
             suffix = file.suffix.lower()
             if suffix == ".pdf":
-                text_paths, image_paths = extract_text_and_images(pdf_path=file, work_dir=pdf_work_dir)
+                text_paths, image_paths, page_texts = extract_text_and_images(pdf_path=file, work_dir=pdf_work_dir)
                 content.extend(text_paths)
+                texts.update(zip(text_paths, page_texts))
                 images.extend(image_paths)
             elif suffix == ".txt":
                 content.append(file)
@@ -150,11 +318,11 @@ def local_doc_process(update_dir: Path | None = None):
                 content.append(file)
             elif suffix == ".json":
                 content.append(file)
-        return content, images
+        return content, images, texts
 
-    content, images = _collect(update_path)
+    content, images, texts = _collect(update_path)
     if not content:
         logger.warning("no file need update")
     if not images:
         logger.warning("no image need update")
-    return content, images
+    return content, images, texts
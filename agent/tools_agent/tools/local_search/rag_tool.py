@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 import asyncio
+import mmap
+import os
 from typing import Optional, ClassVar, List
-import base64
+try:
+    import pybase64 as base64
+except ImportError:  # pragma: no cover - optional speedup
+    import base64
 from pathlib import Path
 import json
 import time
@@ -10,7 +15,7 @@ import time
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from .RAG.rag_main import async_query_local_rag, _DEFAULT_SERVICE, logger
+from .RAG.rag_main import async_query_local_rag, run_async, _DEFAULT_SERVICE, logger
 from .RAG.image_faiss_build import FaissImageStorage
 
 
@@ -29,7 +34,7 @@ class VanillaRAGSearchTool(BaseTool):
     top_k: int = 3
 
     def _run(self, query: str, top_k: Optional[int] = None) -> str:
-        return asyncio.run(self._arun(query, top_k))
+        return run_async(self._arun(query, top_k))
 
     async def _arun(self, query: str, top_k: Optional[int] = None) -> str:  # type: ignore[override]
         start_time = time.time()
@@ -46,6 +51,21 @@ class VanillaRAGSearchTool(BaseTool):
         # Build payload with text hits and inline image data URLs for VLM consumption.
         payload = []
         image_search_start = time.time()
+
+        # the cross-modal image search only depends on the query, so run it once for all hits
+        # and encode the images off the event loop
+        images: list[dict[str, str]] = []
+        if any(r.get("linked_images") for r in results):
+            image_searcher = _DEFAULT_SERVICE.image_vector_storage
+            image_results = await image_searcher.query(text=query, top_k=top_k or self.top_k)
+            img_paths = [
+                p for p in (ir.get("image_path") or ir.get("source_path") or "" for ir in image_results or []) if p
+            ]
+            data_urls = await asyncio.gather(
+                *(asyncio.to_thread(self._encode_image_to_data_url, p) for p in img_paths)
+            )
+            images = [{"path": p, "data_url": url} for p, url in zip(img_paths, data_urls)]
+
         for r in results:
             entry = {
                 "score": r.get("score", 0.0),
@@ -54,19 +74,9 @@ class VanillaRAGSearchTool(BaseTool):
                 "source_type": r.get("source_type"),
                 "pdf_name": r.get("pdf_name"),
                 "pdf_page": r.get("pdf_page"),
-                "images": [],
+                # add top-k images from cross-modal search for relevance
+                "images": list(images) if r.get("linked_images") else [],
             }
-            
-            if r.get("linked_images",[]):
-            # add top-k images from cross-modal search for relevance
-                image_searcher = _DEFAULT_SERVICE.image_vector_storage
-                image_results = await image_searcher.query(text=query, top_k=top_k or self.top_k)
-                for ir in image_results or []:
-                    img_path = ir.get("image_path") or ir.get("source_path") or ""
-                    if img_path:
-                        data_url = self._encode_image_to_data_url(img_path)
-                        entry["images"].append({"path": img_path, "data_url": data_url})
-
             payload.append(entry)
             
         logger.info(f"[vanilla_rag_search] Image enrichment took {time.time() - image_search_start:.2f}s")
@@ -80,8 +90,14 @@ class VanillaRAGSearchTool(BaseTool):
         try:
             p = Path(path)
             mime = "image/" + (p.suffix.lstrip(".").lower() or "png")
-            data = p.read_bytes()
-            b64 = base64.b64encode(data).decode("ascii")
+            with open(p, "rb") as fp:
+                if os.fstat(fp.fileno()).st_size == 0:
+                    return f"data:{mime};base64,"
+                # encode straight from the page cache instead of copying the file into a bytes object first
+                with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    b64 = base64.b64encode(mm).decode("ascii")
             return f"data:{mime};base64,{b64}"
         except Exception:
             return ""
@@ -1,34 +1,96 @@
 import asyncio
 import json
+import threading
+import orjson
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, List
 
 from langchain_core.tools import BaseTool
-from langchain_mcp_adapters.tools import load_mcp_tools
-from langchain_mcp_adapters.sessions import StdioConnection
 
+if TYPE_CHECKING:
+    from langchain_mcp_adapters.sessions import StdioConnection
 
 
-class CustomEncoder(json.JSONEncoder):
-    """Custom JSON encoder for handling special types."""
-    def default(self, obj):
-        if hasattr(obj, '__dict__'):
-            return obj.__dict__
-        return super().default(obj)
+
+def _json_default(obj):
+    """orjson fallback for special types: serialise objects through their __dict__."""
+    if hasattr(obj, '__dict__'):
+        return obj.__dict__
+    return str(obj)
+
+
+def dumps(obj) -> bytes:
+    """Serialise MCP payloads with orjson, handling objects orjson doesn't know natively."""
+    return orjson.dumps(obj, default=_json_default)
+
+
+# parsed config keyed by the file's mtime, so repeated loads skip the read + parse
+_config_cache: tuple[int, dict] | None = None
 
 
 def _load_mcp_config() -> dict:
     """Load MCP server configuration from mcp-server-config.json"""
+    global _config_cache
     config_path = Path(__file__).with_name("mcp-server-config.json")
-    if not config_path.exists():
+    try:
+        mtime = config_path.stat().st_mtime_ns
+    except FileNotFoundError:
         return {}
 
+    if _config_cache is not None and _config_cache[0] == mtime:
+        return _config_cache[1]
+
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        config = orjson.loads(config_path.read_bytes())
     except json.JSONDecodeError:
         print(f"[mcp_client] Error decoding JSON from {config_path}")
         return {}
+    _config_cache = (mtime, config)
+    return config
+
+
+async def _load_server_tools(server_name: str, server_config: dict) -> List[BaseTool]:
+    """Start one MCP server over stdio and return its tools."""
+    # deferred so importing the tool box doesn't pay for the adapter stack up front
+    from langchain_mcp_adapters.tools import load_mcp_tools
+
+    command = server_config.get("command")
+    args = server_config.get("args", [])
+    env = server_config.get("env")
+
+    if not command:
+        print(f"[mcp_client] Skipping {server_name}: no command specified")
+        return []
+
+    try:
+        # Create StdioConnection for the MCP server
+        connection: "StdioConnection" = {
+            'transport': 'stdio',
+            'command': command,
+            'args': args,
+        }
+
+        # Add optional env if provided
+        if env:
+            connection['env'] = env
+
+        print(f"[mcp_client] Loading tools from MCP server: {server_name}")
+
+        # Use langchain_mcp_adapters to load tools
+        tools = await load_mcp_tools(
+            session=None,
+            connection=connection,
+            server_name=server_name
+        )
+
+        print(f"[mcp_client] Loaded {len(tools)} tools from {server_name}")
+        return tools
+
+    except Exception as e:
+        print(f"[mcp_client] Error loading tools from {server_name}: {e}")
+        import traceback
+        traceback.print_exc()
+        return []
 
 
 async def load_mcp_tools_from_config() -> List[BaseTool]:
@@ -45,48 +107,37 @@ async def load_mcp_tools_from_config() -> List[BaseTool]:
         print("[mcp_client] No MCP servers configured")
         return []
 
+    # servers start independently, so wall time is the slowest server rather than the sum
+    results = await asyncio.gather(
+        *(_load_server_tools(name, cfg) for name, cfg in mcp_servers.items()),
+        return_exceptions=True,
+    )
+
     all_tools: List[BaseTool] = []
+    for server_name, result in zip(mcp_servers, results):
+        if isinstance(result, BaseException):
+            print(f"[mcp_client] Error loading tools from {server_name}: {result}")
+            continue
+        all_tools.extend(result)
+    return all_tools
 
-    for server_name, server_config in mcp_servers.items():
-        command = server_config.get("command")
-        args = server_config.get("args", [])
-        env = server_config.get("env")
 
-        if not command:
-            print(f"[mcp_client] Skipping {server_name}: no command specified")
-            continue
+# one long-lived loop thread serves every synchronous caller instead of a fresh asyncio.run per call
+_bg_loop: asyncio.AbstractEventLoop | None = None
+_bg_loop_lock = threading.Lock()
 
-        try:
-            # Create StdioConnection for the MCP server
-            connection: StdioConnection = {
-                'transport': 'stdio',
-                'command': command,
-                'args': args,
-            }
-
-            # Add optional env if provided
-            if env:
-                connection['env'] = env
-
-            print(f"[mcp_client] Loading tools from MCP server: {server_name}")
-
-            # Use langchain_mcp_adapters to load tools
-            tools = await load_mcp_tools(
-                session=None,
-                connection=connection,
-                server_name=server_name
-            )
-
-            print(f"[mcp_client] Loaded {len(tools)} tools from {server_name}")
-            all_tools.extend(tools)
-
-        except Exception as e:
-            print(f"[mcp_client] Error loading tools from {server_name}: {e}")
-            import traceback
-            traceback.print_exc()
-            continue
 
-    return all_tools
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Start the shared background event loop on first use and return it."""
+    global _bg_loop
+    if _bg_loop is not None:
+        return _bg_loop
+    with _bg_loop_lock:
+        if _bg_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="mcp-client-loop", daemon=True).start()
+            _bg_loop = loop
+    return _bg_loop
 
 
 def get_mcp_tools() -> List[BaseTool]:
@@ -97,20 +148,9 @@ def get_mcp_tools() -> List[BaseTool]:
         List of LangChain BaseTool instances.
     """
     try:
-        # Check if there's already a running event loop
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # If we're already in an async context, we need to run in a new thread
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, load_mcp_tools_from_config())
-                return future.result()
-        else:
-            # No running loop, we can use asyncio.run
-            return asyncio.run(load_mcp_tools_from_config())
-    except RuntimeError:
-        # No event loop exists, create one
-        return asyncio.run(load_mcp_tools_from_config())
+        # safe from both plain threads and threads that already run a loop
+        future = asyncio.run_coroutine_threadsafe(load_mcp_tools_from_config(), _background_loop())
+        return future.result()
     except Exception as e:
         print(f"[mcp_client] Failed to load MCP tools: {e}")
         return []
@@ -1,29 +1,62 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import atexit
+import functools
+import hashlib
 import os
-import re
+import string
 from pathlib import Path
 from typing import Dict, List
 
 import dotenv
+import msgpack
+import orjson
 from mcp import StdioServerParameters, types
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 dotenv.load_dotenv()
 
 _CONFIG_PATH = Path(__file__).with_name("mcp-server-config.json")
-_TOOL_CACHE_KEY = "toolCache"
+# tool descriptors live in a binary sidecar so the hand-edited config is never rewritten
+_CACHE_PATH = _CONFIG_PATH.with_suffix(".cache.msgpack")
+
+
+class _EnvTemplate(string.Template):
+    # only ${VAR_NAME}; bare $VAR and $$ are left untouched, unknown names stay as written
+    pattern = r"""
+    \$(?:
+      (?P<escaped>(?!))|
+      (?P<named>(?!))|
+      \{(?P<braced>[^}]+)\}|
+      (?P<invalid>(?!))
+    )
+    """
+
+
+@functools.lru_cache(maxsize=512)
+def _expand_str(value: str) -> str:
+    # the environment is fixed once dotenv has loaded, so each raw string expands the same way every time
+    if "${" not in value:
+        return value
+    return _EnvTemplate(value).safe_substitute(os.environ)
+
+
+def _contains_dollar(value) -> bool:
+    """True when any string in value contains "$"; stops at the first hit and builds nothing."""
+    if isinstance(value, str):
+        return "$" in value
+    if isinstance(value, dict):
+        return any(_contains_dollar(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_contains_dollar(item) for item in value)
+    return False
 
 
 def _expand_env_vars(value):
     """Recursively expand environment variables in strings, dicts, and lists."""
     if isinstance(value, str):
-        # Replace ${VAR_NAME} with os.environ.get('VAR_NAME', '')
-        def replacer(match):
-            var_name = match.group(1)
-            return os.environ.get(var_name, f"${{{var_name}}}")
-        return re.sub(r'\$\{([^}]+)\}', replacer, value)
+        return _expand_str(value)
     elif isinstance(value, dict):
         return {k: _expand_env_vars(v) for k, v in value.items()}
     elif isinstance(value, list):
@@ -37,20 +70,77 @@ class McpServerConfig(BaseModel):
     excluded_tools: List[str] = Field(default_factory=list)
 
 
+# parsed config and the mtime it was read at, every loader call reuses it until the file changes
+_config_cache: Dict | None = None
+_config_mtime_ns: int = -1
+# tool cache read from the sidecar, keyed by server digest, and the mtime it was read at
+_tool_cache: Dict | None = None
+_tool_cache_mtime_ns: int = -1
+# tool-cache writes are coalesced: save_tools_cache marks the cache dirty and one flush writes it
+_pending_flush: asyncio.TimerHandle | None = None
+# loop the pending flush was scheduled on; a handle on a loop that has since closed never fires
+_pending_loop: asyncio.AbstractEventLoop | None = None
+_dirty = False
+_FLUSH_DELAY = 0.1
+# validated types.Tool lists per server identifier, paired with the raw list they were built from
+_TOOL_LIST_ADAPTER = TypeAdapter(List[types.Tool])
+_TOOL_OBJ_CACHE: dict[tuple, tuple[list, List[types.Tool]]] = {}
+
+
 def _load_config_file() -> Dict:
     """Load the shared MCP configuration JSON if it exists."""
-    if not _CONFIG_PATH.exists():
+    global _config_cache, _config_mtime_ns
+    try:
+        mtime_ns = _CONFIG_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
         return {}
+    if _config_cache is not None and mtime_ns == _config_mtime_ns:
+        return _config_cache
     try:
-        return json.loads(_CONFIG_PATH.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
+        config_data = orjson.loads(_CONFIG_PATH.read_bytes())
+    except orjson.JSONDecodeError:
         return {}
+    _config_cache = config_data
+    _config_mtime_ns = mtime_ns
+    return config_data
+
+
+def _load_tool_cache() -> Dict:
+    """Load the tool-cache sidecar, reusing the parsed copy while the file is unchanged."""
+    global _tool_cache, _tool_cache_mtime_ns
+    if _dirty and _tool_cache is not None:
+        # the in-memory copy is ahead of the file until the pending flush runs
+        return _tool_cache
+    try:
+        mtime_ns = _CACHE_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        if _tool_cache is None:
+            _tool_cache = {}
+        return _tool_cache
+    if _tool_cache is not None and mtime_ns == _tool_cache_mtime_ns:
+        return _tool_cache
+    try:
+        _tool_cache = msgpack.unpackb(_CACHE_PATH.read_bytes(), raw=False)
+    except Exception:
+        # unreadable sidecar, start over and let the next save rewrite it
+        _tool_cache = {}
+    _tool_cache_mtime_ns = mtime_ns
+    return _tool_cache
+
+
+# built server configs and the "mcpServers" dict they were built from
+_configs_cache: List[McpServerConfig] | None = None
+_configs_source: Dict | None = None
 
 
 def load_mcp_server_configs() -> List[McpServerConfig]:
     """Return all configured MCP servers declared in the config JSON."""
+    global _configs_cache, _configs_source
     config_data = _load_config_file()
     servers = config_data.get("mcpServers", {})
+    # the loader hands back the same dict until the file's mtime changes, so identity is the cache key
+    if _configs_cache is not None and servers is _configs_source:
+        return list(_configs_cache)
     configs: List[McpServerConfig] = []
 
     for name, payload in servers.items():
@@ -62,10 +152,12 @@ def load_mcp_server_configs() -> List[McpServerConfig]:
         env = payload.get("env") or None
         excluded = payload.get("excluded_tools") or []
 
-        # Expand environment variables in command, args, and env
-        command = _expand_env_vars(command)
-        args = _expand_env_vars(args)
-        env = _expand_env_vars(env) if env else None
+        # Expand environment variables in command, args, and env;
+        # most servers reference none, so a read-only scan lets them skip rebuilding the values
+        if _contains_dollar(command) or _contains_dollar(args) or _contains_dollar(env):
+            command = _expand_env_vars(command)
+            args = _expand_env_vars(args)
+            env = _expand_env_vars(env) if env else None
 
         server_param = StdioServerParameters(
             command=command,
@@ -80,41 +172,97 @@ def load_mcp_server_configs() -> List[McpServerConfig]:
             )
         )
 
-    return configs
+    _configs_cache = configs
+    _configs_source = servers
+    return list(configs)
 
 
-def _cache_identifier(server_param: StdioServerParameters) -> str:
-    """Build a stable identifier for persisting tool caches per server."""
-    args = server_param.args or []
-    env = server_param.env or {}
-    env_part = ",".join(f"{key}={value}" for key, value in sorted(env.items()))
-    return f"{server_param.command}|{' '.join(args)}|{env_part}"
+def _clear_configs_cache() -> None:
+    global _configs_cache, _configs_source
+    _configs_cache = None
+    _configs_source = None
+
+
+load_mcp_server_configs.cache_clear = _clear_configs_cache
+
+
+def _cache_identifier(server_param: StdioServerParameters) -> tuple:
+    """Build a stable, hashable identifier for a server's command line and environment."""
+    return (
+        server_param.command,
+        tuple(server_param.args or ()),
+        tuple(sorted((server_param.env or {}).items())),
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _cache_key(identifier: tuple) -> str:
+    """JSON needs string keys, so the persisted tool cache uses a short digest of the identifier."""
+    return hashlib.blake2b(repr(identifier).encode("utf-8"), digest_size=16).hexdigest()
 
 
 def get_cached_tools(server_param: StdioServerParameters) -> List[types.Tool] | None:
     """Retrieve cached MCP tool descriptors for the given server."""
-    config_data = _load_config_file()
-    cache = config_data.get(_TOOL_CACHE_KEY, {})
-    cached = cache.get(_cache_identifier(server_param))
+    cache = _load_tool_cache()
+    identifier = _cache_identifier(server_param)
+    cached = cache.get(_cache_key(identifier))
     if not cached:
         return None
-    return [types.Tool(**tool_data) for tool_data in cached]
+    # the validated objects stay valid as long as they came from this exact raw list;
+    # a cache reloaded from disk holds new lists and is validated again
+    entry = _TOOL_OBJ_CACHE.get(identifier)
+    if entry is not None and entry[0] is cached:
+        return entry[1]
+    tool_objs = [types.Tool(**tool_data) for tool_data in cached]
+    _TOOL_OBJ_CACHE[identifier] = (cached, tool_objs)
+    return tool_objs
 
 
 def save_tools_cache(server_param: StdioServerParameters, tools: List[types.Tool]) -> None:
     """Persist MCP tool descriptors so subsequent runs can avoid re-fetching."""
-    config_data = _load_config_file()
-    cache = config_data.setdefault(_TOOL_CACHE_KEY, {})
-    identifier = _cache_identifier(server_param)
+    global _dirty, _pending_flush, _pending_loop
+    cache = _load_tool_cache()
+    server_id = _cache_identifier(server_param)
+    identifier = _cache_key(server_id)
 
-    serialised: List[Dict] = []
-    for tool in tools:
-        if hasattr(tool, "model_dump"):
-            serialised.append(tool.model_dump(mode="json"))
-        elif hasattr(tool, "dict"):
-            serialised.append(tool.dict())
-        else:
-            serialised.append(json.loads(tool.json()))
+    # types.Tool is a pydantic v2 model, serialise the whole list in one call
+    serialised: List[Dict] = _TOOL_LIST_ADAPTER.dump_python(tools, mode="json")
 
     cache[identifier] = serialised
-    _CONFIG_PATH.write_text(json.dumps(config_data, indent=2), encoding="utf-8")
+    # the fetched tools are already validated, reuse them for the next lookup
+    _TOOL_OBJ_CACHE[server_id] = (serialised, list(tools))
+    _dirty = True
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _flush_tool_cache()
+        return
+    # toolkits initialising together share one write instead of rewriting the file each;
+    # a handle left on another (e.g. finished asyncio.run) loop or cancelled is not relied on
+    if (
+        _pending_flush is None
+        or _pending_flush.cancelled()
+        or _pending_loop is not loop
+        or _pending_loop.is_closed()
+    ):
+        _pending_flush = loop.call_later(_FLUSH_DELAY, _flush_tool_cache)
+        _pending_loop = loop
+
+
+def _flush_tool_cache() -> None:
+    """Atomically write the in-memory tool cache to the msgpack sidecar."""
+    global _pending_flush, _pending_loop, _dirty, _tool_cache_mtime_ns
+    _pending_flush = None
+    _pending_loop = None
+    if not _dirty or _tool_cache is None:
+        return
+    tmp_path = _CACHE_PATH.with_suffix(".msgpack.tmp")
+    tmp_path.write_bytes(msgpack.packb(_tool_cache, use_bin_type=True))
+    os.replace(tmp_path, _CACHE_PATH)
+    _tool_cache_mtime_ns = _CACHE_PATH.stat().st_mtime_ns
+    _dirty = False
+
+
+# a flush still pending when the loop or process ends is written on exit
+atexit.register(_flush_tool_cache)
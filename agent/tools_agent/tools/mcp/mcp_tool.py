@@ -6,10 +6,11 @@ from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
 from pydantic_core import to_json
 from jsonschema_pydantic import jsonschema_to_pydantic
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from .mcp_server_config import McpServerConfig, get_cached_tools, save_tools_cache
 
+
 # discover tool from server and make a wrapper
 class McpToolkit(BaseToolkit):
     # tool name
@@ -22,15 +23,20 @@ class McpToolkit(BaseToolkit):
     _session: Optional[ClientSession] = None
     _tools: List[BaseTool] = []
     _client = None
-    # set asynic lock for initialization once
-    _init_lock: asyncio.Lock = None
+    # per-instance init lock, created on the loop that first starts the session: the session
+    # belongs to this toolkit, and a lock made elsewhere could be bound to a dead loop
+    _init_lock: Optional[asyncio.Lock] = PrivateAttr(default=None)
+    _init_loop: Optional[asyncio.AbstractEventLoop] = PrivateAttr(default=None)
     
     def __init__(self, **data):
         super().__init__(**data)
-        self._init_lock = asyncio.Lock()
         self._tools = []
         
     async def _start_session(self):
+        loop = asyncio.get_running_loop()
+        if self._init_lock is None or self._init_loop is not loop:
+            self._init_lock = asyncio.Lock()
+            self._init_loop = loop
         # use async lock and initialize only once
         async with self._init_lock:
             if self._session:
@@ -151,3 +157,40 @@ async def convert_mcp_tool_to_langchain_tool(server_config: McpServerConfig, for
     await toolkit.initialize(force_refresh=force_update)
     return toolkit
 
+
+
+async def convert_all(
+    configs: List[McpServerConfig],
+    force_update: bool = False,
+    concurrency: int = 8,
+    timeout: float = 10.0,
+) -> List[McpToolkit]:
+    """Initialise toolkits for every server concurrently, skipping servers that fail or time out."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _convert(server_config: McpServerConfig) -> McpToolkit:
+        # built outside the timeout so a server that fails or hangs mid-initialize can still be
+        # closed; only toolkits whose initialize() finished are returned
+        toolkit = McpToolkit(
+            name=server_config.server_name,
+            server_param=server_config.server_param,
+            excluded_tools=server_config.excluded_tools,
+        )
+        async with semaphore:
+            try:
+                async with asyncio.timeout(timeout):
+                    await toolkit.initialize(force_refresh=force_update)
+            except BaseException:
+                # stop the stdio subprocess and session started before the failure
+                await toolkit.close()
+                raise
+        return toolkit
+
+    results = await asyncio.gather(*(_convert(c) for c in configs), return_exceptions=True)
+    toolkits: List[McpToolkit] = []
+    for server_config, result in zip(configs, results):
+        if isinstance(result, BaseException):
+            print(f"Error initializing toolkit {server_config.server_name}: {result!r}")
+            continue
+        toolkits.append(result)
+    return toolkits
@@ -1,11 +1,143 @@
-import json
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import itertools
 import random
-from bs4 import BeautifulSoup
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from lxml import etree, html as lxml_html
 from typing import Type
 from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool
 from . import HEADERS, USER_AGENTS
+from ....log.logger import logger
+
+# one pooled session keeps TCP/TLS connections alive across fallback URLs and calls
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=1, backoff_factor=0.1))
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+# shuffled once, then rotated in a fixed order so warm connections see a stable fingerprint
+_UA_ITER = itertools.cycle(random.sample(USER_AGENTS, len(USER_AGENTS)))
+
+_BASE_URLS = ("https://www.bing.com", "https://cn.bing.com")
+# shared by every call: one worker per base URL for each of _MAX_CONCURRENT_SEARCHES searches,
+# so a losing endpoint still finishing in the background never queues the next search
+_MAX_CONCURRENT_SEARCHES = 8
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=len(_BASE_URLS) * _MAX_CONCURRENT_SEARCHES, thread_name_prefix="bing-search"
+)
+_RACE_TIMEOUT = 10
+# (connect, read) per attempt, and each fetch stops reading once _RACE_TIMEOUT has passed,
+# so a worker is never held much longer than the race that is waiting on it
+_REQUEST_TIMEOUT = (3, 5)
+_STREAM_CHUNK = 8192
+
+# XPath equivalents of the CSS selectors, compiled once instead of on every select() call
+_HAS_CLASS = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+_BING_ITEMS_FALLBACK = etree.XPath("//ol[@id='b_results']/li")
+_BING_LINK = etree.XPath(".//h2//a")
+_BING_SNIPPETS = (
+    etree.XPath(f".//div[{_HAS_CLASS.format('b_caption')}]//p"),
+    etree.XPath(".//p"),
+    etree.XPath(f".//div[{_HAS_CLASS.format('b_caption')}]"),
+)
+
+
+def _text(elem) -> str:
+    # same result as bs4's get_text(strip=True): every text node stripped, then joined
+    return "".join(part.strip() for part in elem.itertext())
+
+
+def _parse_item(item) -> tuple[str, str, str] | None:
+    """Return (title, url, snippet) for one result item, or None when it has no usable link."""
+    try:
+        # Extract title and URL
+        links = _BING_LINK(item)
+        if not links:
+            return None
+        link_elem = links[0]
+
+        title = _text(link_elem)
+        url = link_elem.get('href', '')
+
+        # Extract snippet/description
+        snippet_elem = next(
+            (found[0] for found in (xpath(item) for xpath in _BING_SNIPPETS) if found),
+            None,
+        )
+        snippet = _text(snippet_elem) if snippet_elem is not None else ''
+    except Exception as item_error:
+        logger.debug("[BingSearchTool] Error parsing item: %s", item_error)
+        return None
+    # Only keep items with a valid title and URL
+    return (title, url, snippet) if title and url else None
+
+
+def _fetch_and_parse(base_url: str, query: str, max_results: int) -> list[dict]:
+    """Fetch one Bing endpoint and parse its result list, empty on any failure."""
+    results = []
+    try:
+        # Use HTML scraping (Bing doesn't provide free JSON API)
+        search_url = f"{base_url}/search"
+        params = {"q": query}
+
+        # rotate user agents to avoid detection
+        headers = HEADERS.copy()
+        headers["User-Agent"] = next(_UA_ITER)
+
+        logger.debug("[BingSearchTool] Trying %s", base_url)
+        deadline = time.monotonic() + _RACE_TIMEOUT
+        parsed = []
+        root = None
+        with _SESSION.get(search_url, params=params, headers=headers, timeout=_REQUEST_TIMEOUT, stream=True) as response:
+            if response.status_code != 200:
+                logger.debug("[BingSearchTool] Got status code %s from %s", response.status_code, base_url)
+                return []
+
+            # parse while the body is still arriving: each result item is handled and
+            # cleared as soon as its closing tag is seen, and the download stops once enough are in
+            parser = lxml_html.HTMLPullParser(events=("end",), tag="li")
+
+            def _collect():
+                for _, elem in parser.read_events():
+                    if "b_algo" in (elem.get("class") or "").split():
+                        parsed.append(_parse_item(elem))
+                        elem.clear()
+
+            for chunk in response.iter_content(_STREAM_CHUNK):
+                parser.feed(chunk)
+                _collect()
+                if parsed and len(parsed) >= max_results:
+                    break
+                if time.monotonic() > deadline:
+                    logger.debug("[BingSearchTool] %s still streaming after %ss, giving up", base_url, _RACE_TIMEOUT)
+                    break
+            else:
+                root = parser.close()
+                _collect()
+
+        if not parsed and root is not None:
+            logger.debug("[BingSearchTool] No results found with selector 'li.b_algo', trying alternative selectors")
+            # Try alternative selectors on the fully parsed page
+            parsed = [_parse_item(item) for item in _BING_ITEMS_FALLBACK(root)[:max_results]]
+
+        results = [
+            {"title": title, "url": url, "content": snippet}
+            for title, url, snippet in filter(None, parsed[:max_results])
+        ]
+
+        if results:
+            logger.debug("[BingSearchTool] Successfully found %d results from %s", len(results), base_url)
+
+    except requests.exceptions.RequestException as req_error:
+        logger.warning("[BingSearchTool] Request error for %s: %s", base_url, req_error)
+    except Exception as parse_error:
+        logger.warning("[BingSearchTool] Parse error for %s: %s", base_url, parse_error)
+    return results
+
 
 class BingSearchArgs(BaseModel):
     query: str = Field(..., description="The search query string.")
@@ -18,95 +150,40 @@ class BingSearchTool(BaseTool):
     description: str = """A tool to perform Bing searches
     return seatch result with titles, URLs, and snippets.
     Use this to find current information about any topic."""
-    _base_url: list = ["https://www.bing.com", "https://cn.bing.com"]
+    _base_url: list = list(_BASE_URLS)
     
     
     def _run(self, query: str, max_results: int = 5) -> str:
         try:
-            print(f"[BingSearchTool] Searching for: {query}")
+            logger.debug("[BingSearchTool] Searching for: %s", query)
             results = []
 
-            # Try each base URL until we get results
-            for base_url in self._base_url:
-                if results:  # If we already have results, break
-                    break
-
-                try:
-                    # Use HTML scraping (Bing doesn't provide free JSON API)
-                    search_url = f"{base_url}/search"
-                    params = {"q": query}
-
-                    # Use random user agent to avoid detection
-                    headers = HEADERS.copy()
-                    headers["User-Agent"] = random.choice(USER_AGENTS)
-
-                    print(f"[BingSearchTool] Trying {base_url}")
-                    response = requests.get(search_url, params=params, headers=headers, timeout=15)
-
-                    if response.status_code != 200:
-                        print(f"[BingSearchTool] Got status code {response.status_code}, trying next URL")
-                        continue
-
-                    soup = BeautifulSoup(response.content, 'html.parser')
-
-                    # Extract search results from Bing's HTML structure
-                    search_items = soup.select('li.b_algo')
-
-                    if not search_items:
-                        print(f"[BingSearchTool] No results found with selector 'li.b_algo', trying alternative selectors")
-                        # Try alternative selectors
-                        search_items = soup.select('ol#b_results > li')
-
-                    for item in search_items[:max_results]:
-                        try:
-                            # Extract title and URL
-                            link_elem = item.select_one('h2 a')
-                            if not link_elem:
-                                continue
-
-                            title = link_elem.get_text(strip=True)
-                            url = link_elem.get('href', '')
-
-                            # Extract snippet/description
-                            snippet_elem = (
-                                item.select_one('div.b_caption p') or
-                                item.select_one('p') or
-                                item.select_one('div.b_caption')
-                            )
-                            snippet = snippet_elem.get_text(strip=True) if snippet_elem else ''
-
-                            # Only add if we have valid title and URL
-                            if title and url:
-                                results.append({
-                                    "title": title,
-                                    "url": url,
-                                    "content": snippet
-                                })
-                        except Exception as item_error:
-                            print(f"[BingSearchTool] Error parsing item: {item_error}")
-                            continue
-
+            # race every base URL and take the first one that yields results,
+            # so a slow or failing endpoint no longer delays the other
+            futures = [
+                _EXECUTOR.submit(_fetch_and_parse, base_url, query, max_results)
+                for base_url in self._base_url
+            ]
+            try:
+                for future in as_completed(futures, timeout=_RACE_TIMEOUT):
+                    results = future.result()
                     if results:
-                        print(f"[BingSearchTool] Successfully found {len(results)} results from {base_url}")
-
-                except requests.exceptions.RequestException as req_error:
-                    print(f"[BingSearchTool] Request error for {base_url}: {req_error}")
-                    continue
-                except Exception as parse_error:
-                    print(f"[BingSearchTool] Parse error for {base_url}: {parse_error}")
-                    continue
+                        break
+            except FuturesTimeout:
+                logger.debug("[BingSearchTool] No endpoint answered within %ss", _RACE_TIMEOUT)
+            finally:
+                for future in futures:
+                    future.cancel()
 
             # Return results or error message
             if results:
-                return json.dumps({"results": results}, ensure_ascii=False)
+                return orjson.dumps({"results": results}).decode()
             else:
                 error_msg = f"No search results found for query: {query}"
-                print(f"[BingSearchTool] {error_msg}")
-                return json.dumps({"error": error_msg, "results": []}, ensure_ascii=False)
+                logger.debug("[BingSearchTool] %s", error_msg)
+                return orjson.dumps({"error": error_msg, "results": []}).decode()
 
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
-            print(f"[BingSearchTool] {error_msg}")
-            import traceback
-            traceback.print_exc()
-            return json.dumps({"error": error_msg, "results": []}, ensure_ascii=False)
+            logger.exception("[BingSearchTool] %s", error_msg)
+            return orjson.dumps({"error": error_msg, "results": []}).decode()
@@ -1,11 +1,63 @@
-import json
+import asyncio
+import functools
+import orjson
 import os
 import dotenv
 from typing import Type
 from pydantic import BaseModel, Field, PrivateAttr
 from langchain_core.tools import BaseTool
+from ....log.logger import logger
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional async client
+    aiohttp = None
 dotenv.load_dotenv()
 
+_SERPAPI_URL = "https://serpapi.com/search.json"
+_aio_session = None
+_aio_loop = None
+
+
+@functools.cache
+def _serpapi():
+    """Import serpapi on first use, once; returns (GoogleSearch, None) or (None, import error)."""
+    # Lazy import to avoid hard dependency at startup
+    try:
+        from serpapi import GoogleSearch  # type: ignore
+    except Exception as e:
+        return None, e
+    return GoogleSearch, None
+
+
+def _organic_results(search_results: dict, max_results: int) -> list[dict]:
+    return [
+        {"title": i['title'], "url": i['link'], "snippet": i['snippet']}
+        for i in search_results['organic_results'][:max_results]
+    ]
+
+
+def _retire_session(session, loop) -> None:
+    """Close a session left behind by an earlier event loop, on that loop when it still runs."""
+    if session.closed:
+        return
+    if loop.is_running():
+        # its loop is still running in another thread, close the session there
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+    # otherwise the loop is gone and nothing can await the close; the reference is just dropped
+
+
+def _get_aio_session():
+    """Return the shared aiohttp session for the running loop, creating it on first use."""
+    global _aio_session, _aio_loop
+    loop = asyncio.get_running_loop()
+    # a session belongs to the loop that created it; construction never awaits, so no lock is needed
+    if _aio_session is None or _aio_session.closed or _aio_loop is not loop:
+        if _aio_session is not None and _aio_loop is not loop:
+            _retire_session(_aio_session, _aio_loop)
+        _aio_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15))
+        _aio_loop = loop
+    return _aio_session
+
         
 class GoogleSearchArgs(BaseModel):
     query: str = Field(..., description="The search query string.")
@@ -19,16 +71,13 @@ class GoogleSearchTool(BaseTool):
     Use this to find current information about any topic."""
     
     def _run(self, query: str, max_results: int = 5) -> str:
-        # Lazy import to avoid hard dependency at startup
-        try:
-            from serpapi import GoogleSearch  # type: ignore
-        except Exception as ie:
-            return json.dumps({
-                "error": f"serpapi module not available: {ie}. Install 'google-search-results' or remove GoogleSearchTool.",
+        GoogleSearch, import_error = _serpapi()
+        if GoogleSearch is None:
+            return orjson.dumps({
+                "error": f"serpapi module not available: {import_error}. Install 'google-search-results' or remove GoogleSearchTool.",
                 "results": []
-            }, ensure_ascii=False)
+            }).decode()
         api_key = os.getenv("GOOGLE_API_KEY")
-        results = []
         if not api_key:
             raise ValueError("GOOGLE_API_KEY is not set")
         try:
@@ -39,20 +88,33 @@ class GoogleSearchTool(BaseTool):
             }
             search = GoogleSearch(params)
             search_results = search.get_dict()
-            text_block = search_results['organic_results'][:max_results]
-            for i in text_block:
-                results.append({
-                    "title": i['title'],
-                    "url" : i['link'],
-                    "snippet" : i['snippet']
-                })
-            return json.dumps({"results": results}, ensure_ascii=False)
+            results = _organic_results(search_results, max_results)
+            return orjson.dumps({"results": results}).decode()
         except Exception as e:
-            print(f"[GoogleSearch] Error: {e}")
-            import traceback
-            traceback.print_exc()
-            return json.dumps({"error": str(e), "results": []}, ensure_ascii=False)
+            logger.exception("[GoogleSearch] Error: %s", e)
+            return orjson.dumps({"error": str(e), "results": []}).decode()
 
 
     async def _arun(self, query: str, max_results: int = 5) -> str:
-        return self._run(query, max_results)
+        if aiohttp is None:
+            # no async client installed, at least keep the blocking call off the event loop
+            return await asyncio.to_thread(self._run, query, max_results)
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY is not set")
+        try:
+            params = {
+                "engine": "google",
+                "q": query,
+                "api_key": api_key,
+            }
+            # query the SerpApi endpoint directly so concurrent searches overlap
+            async with _get_aio_session().get(_SERPAPI_URL, params=params) as response:
+                # surface HTTP errors (bad key, quota) instead of parsing an error body as no results
+                response.raise_for_status()
+                search_results = await response.json(loads=orjson.loads)
+            results = _organic_results(search_results, max_results)
+            return orjson.dumps({"results": results}).decode()
+        except Exception as e:
+            logger.exception("[GoogleSearch] Error: %s", e)
+            return orjson.dumps({"error": str(e), "results": []}).decode()
@@ -0,0 +1,46 @@
+// Injected into every handbook page context by unsw_search.py (context.add_init_script).
+// Does the overview/course parsing inside the page so only the parsed result crosses CDP.
+window.__extractHandbook__ = ({ overviewSelector, maxBlocks, maxCourses }) => {
+    const h1 = document.querySelector("h1");
+    const bodyText = document.body ? document.body.innerText : "";
+
+    // nested overview blocks match several selectors, keep each text once
+    const overview = [];
+    const seen = new Set();
+    for (const el of document.querySelectorAll(overviewSelector)) {
+        const text = el.innerText.trim();
+        if (seen.has(text)) continue;
+        seen.add(text);
+        if (seen.size > maxBlocks) break;
+        if (text.length > 30) overview.push(text);
+    }
+
+    // Look for UoC in page HTML
+    const credit = /(\d+)\s*(?:UoC|units of credit)/i.exec(document.documentElement.innerHTML);
+
+    // Fallback paragraphs when nothing else is found
+    const paragraphs = [...document.querySelectorAll("p")]
+        .slice(0, 5)
+        .map((p) => p.innerText.trim())
+        .filter((text) => text.length > 50);
+
+    // course code (e.g., COMP9021, INFS1000), the name after it and an optional UoC,
+    // in brackets on the same line or on the line below; the first match per code wins
+    const courseRe = /\b([A-Z]{4}\d{4})\b[^\S\n]*[-–]?[^\S\n]*([^()\n]{0,120})(?:\((\d+)\s*UoC\)|\n[^\S\n]*(\d+)\s*UoC)?/g;
+    const courses = [];
+    const codes = new Set();
+    for (const m of bodyText.matchAll(courseRe)) {
+        if (codes.has(m[1])) continue;
+        codes.add(m[1]);
+        courses.push({ code: m[1], name: m[2].trim(), uoc: m[3] || m[4] || null });
+        if (courses.length >= maxCourses) break;
+    }
+
+    return {
+        h1: h1 ? h1.innerText : null,
+        overview,
+        credits: credit ? credit[1] : null,
+        paragraphs,
+        courses,
+    };
+};
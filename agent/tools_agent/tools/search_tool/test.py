@@ -1,13 +1,5 @@
 import pprint
 
-from search_engine_parser.core.engines.bing import Search as BingSearch
-from search_engine_parser.core.engines.yahoo import Search as YahooSearch
-try:
-    # Optional: Only import Google if you want to test it
-    from search_engine_parser.core.engines.baidu import Search as GoogleSearch
-except Exception:
-    GoogleSearch = None
-
 
 # Minimal test for search_engine_parser (no agent tool).
 QUERY = "who is taylor swift"
@@ -66,6 +58,15 @@ def try_engine(name, engine):
 
 
 if __name__ == "__main__":
+    # engines are imported here so collecting or importing this module stays cheap
+    from search_engine_parser.core.engines.bing import Search as BingSearch
+    from search_engine_parser.core.engines.yahoo import Search as YahooSearch
+    try:
+        # Optional: Only import Google if you want to test it
+        from search_engine_parser.core.engines.baidu import Search as GoogleSearch
+    except Exception:
+        GoogleSearch = None
+
     # Google tends to flag automated traffic; run it last or skip.
     try_engine("Yahoo", YahooSearch())
     try_engine("Bing", BingSearch())
@@ -1,12 +1,32 @@
 
+import asyncio
+import atexit
+import functools
 import os
 import re
+import threading
 import time
+from pathlib import Path
 from typing import Optional
+
+import orjson
 from dotenv import load_dotenv
 
+from ....log.logger import logger
+
 try:
-    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401  (enables httpx's HTTP/2 transport)
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+try:
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 except ImportError:
     print("Playwright not installed. Install with:")
     print("pip install playwright")
@@ -16,18 +36,335 @@ except ImportError:
 # Load environment variables
 load_dotenv()
 
+# one Chromium per headless mode for the whole process, plus a pool of warm (context, page) pairs;
+# async Playwright objects belong to the loop that created them, so they all live on one dedicated
+# background loop and scraper methods called from any other loop (e.g. each asyncio.run) hop onto it
+_POOL_SIZE = 4
+# pages loading at once in scrape_courses_bulk
+_COURSE_FETCH_CONCURRENCY = 6
+
+# overview/course parser injected into every context, see handbook_extractor.js
+_EXTRACTOR_JS = Path(__file__).resolve().parent / "handbook_extractor.js"
+_MAX_COURSES = 50
+
+# content blocks waited on after a domcontentloaded navigation
+_OVERVIEW_SELECTOR = "main h1, .program-overview, [class*='overview']"
+_COURSE_LIST_SELECTOR = "a[href*='/courses/']"
+_OVERVIEW_TEXT_SELECTOR = (
+    ".program-overview, .overview, [class*='overview'], .program-description, main p"
+)
+_OVERVIEW_MAX_BLOCKS = 15
+
+_SEARCH_MAX_RESULTS = 10
+# keyword filter run in the page: distinct matching lines, their count and the first few
+_SEARCH_LINES_JS = """
+([kw, limit]) => {
+    const unique = new Set();
+    let matched = false;
+    for (const raw of document.body.innerText.split("\\n")) {
+        if (!raw.toLowerCase().includes(kw)) continue;
+        matched = true;
+        const line = raw.trim();
+        if (line.length > 5) unique.add(line);
+    }
+    return {matched, count: unique.size, lines: [...unique].slice(0, limit)};
+}
+"""
+_pool_loop: asyncio.AbstractEventLoop | None = None
+_pool_loop_guard = threading.Lock()
+_pool_lock: asyncio.Lock | None = None
+_playwright = None
+_browsers: dict = {}
+_page_pools: dict[bool, list] = {}
+
+
+def _playwright_loop() -> asyncio.AbstractEventLoop:
+    """Start the background loop that owns every Playwright object on first use and return it."""
+    global _pool_loop
+    if _pool_loop is not None:
+        return _pool_loop
+    with _pool_loop_guard:
+        if _pool_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="handbook-playwright-loop", daemon=True).start()
+            _pool_loop = loop
+    return _pool_loop
+
+
+def _on_pool_loop(fn):
+    """Run an async function on the Playwright loop, awaiting it from whichever loop called."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        loop = _playwright_loop()
+        if asyncio.get_running_loop() is loop:
+            return await fn(*args, **kwargs)
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(fn(*args, **kwargs), loop))
+    return wrapper
+
+
+async def _checkout_page(headless: bool):
+    """Return a (context, page) pair, launching the shared browser on first use. Runs on the pool loop."""
+    global _playwright, _pool_lock
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+
+    async with _pool_lock:
+        if _playwright is None:
+            _playwright = await async_playwright().start()
+        browser = _browsers.get(headless)
+        if browser is None or not browser.is_connected():
+            browser = _browsers[headless] = await _playwright.chromium.launch(headless=headless)
+            _page_pools[headless] = []
+        pool = _page_pools[headless]
+
+    while pool:
+        context, page = pool.pop()
+        if not page.is_closed():
+            return context, page
+        await context.close()
+
+    context = await browser.new_context()
+    await context.add_init_script(path=str(_EXTRACTOR_JS))
+    page = await context.new_page()
+    # Set a reasonable timeout
+    page.set_default_timeout(30000)  # 30 seconds
+    return context, page
+
+
+async def _checkin_page(headless: bool, context, page) -> None:
+    """Hand a page back to the pool, closing it when the pool is full or the page is gone."""
+    pool = _page_pools.get(headless)
+    if pool is not None and len(pool) < _POOL_SIZE and not page.is_closed():
+        try:
+            # stop any navigation still in flight so the next checkout starts from a blank page
+            await page.goto("about:blank")
+        except Exception:
+            await context.close()
+            return
+        pool.append((context, page))
+        return
+    await context.close()
+
+
+@_on_pool_loop
+async def shutdown_browsers() -> None:
+    """Close every pooled page and shared browser and stop Playwright."""
+    global _playwright
+    if _pool_lock is None:
+        return
+    async with _pool_lock:
+        for pool in _page_pools.values():
+            while pool:
+                context, _ = pool.pop()
+                await context.close()
+        _page_pools.clear()
+        for browser in _browsers.values():
+            await browser.close()
+        _browsers.clear()
+        if _playwright:
+            await _playwright.stop()
+            _playwright = None
+
+
+def _shutdown_at_exit() -> None:
+    """Close the shared browser at interpreter exit; the daemon pool loop is still running then."""
+    loop = _pool_loop
+    if loop is None or _playwright is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(shutdown_browsers(), loop).result(timeout=10)
+    except Exception:
+        pass
+
+
+atexit.register(_shutdown_at_exit)
+
+
+async def _load_course_page(page, url: str) -> str:
+    """Load one course URL, raising when the handbook has no such page."""
+    response = await page.goto(url, wait_until="domcontentloaded")
+    if response is not None and not response.ok:
+        raise RuntimeError(f"HTTP {response.status} for {url}")
+    await page.wait_for_selector("h1", state="visible", timeout=10000)
+    return url
+
+
+class _HandbookCache:
+    """Parsed handbook results on disk, one JSON file per key, expired after a TTL."""
+
+    def __init__(self, root: Path, ttl: float = 86400):
+        self.root = root
+        self.ttl = ttl
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            entry = orjson.loads(self._path(key).read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        if time.time() - entry.get("saved_at", 0) > entry.get("ttl", self.ttl):
+            return None
+        return entry.get("value")
+
+    def put(self, key: str, value: dict, ttl: Optional[float] = None) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry = {"saved_at": time.time(), "ttl": self.ttl if ttl is None else ttl, "value": value}
+        # write then rename so a concurrent reader never sees half a file
+        tmp = self._path(key).with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(orjson.dumps(entry))
+        tmp.replace(self._path(key))
+
+
+# handbook pages change at most daily, so a scraped program is reused for a day
+_handbook_cache = _HandbookCache(Path(__file__).resolve().parent / "handbook_cache")
+
+_CODE_RE = re.compile(r'\b[A-Z]{4}\d{4}\b')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+class HandbookAPIClient:
+    """Program and course lookups against the handbook's Elasticsearch endpoint.
+
+    The handbook SPA fetches its data from /api/es/search, so asking it directly skips
+    Chromium, the DOM and CDP. Lookups return None when the API is unavailable, has no
+    match or returns a record that does not validate (code mismatch, no title, unknown
+    study level), and callers fall back to HandbookScraperPlaywright; only validated
+    records are cached.
+    """
+
+    base_url = "https://www.handbook.unsw.edu.au"
+    # Elasticsearch content types behind course and program pages
+    _CONTENT_TYPES = {"course": "unsw_psubject", "program": "unsw_pcourse"}
+
+    def __init__(self, timeout: float = 10.0):
+        # one pooled keep-alive client per process, shared by every lookup
+        self._client = httpx.Client(
+            http2=_HTTP2,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+            headers={"Content-Type": "application/json"},
+        )
+
+    def _search(self, kind: str, code: str, year: str) -> Optional[dict]:
+        content_type = self._CONTENT_TYPES[kind]
+        body = {
+            "query": {
+                "bool": {
+                    "must": [
+                        {"query_string": {"query": f"{content_type}.code: {code}"}},
+                        {"term": {"live": True}},
+                        {"query_string": {"fields": [f"{content_type}.implementation_year"], "query": f"*{year}*"}},
+                    ]
+                }
+            },
+            "size": 1,
+        }
+        try:
+            response = self._client.post(f"{self.base_url}/api/es/search", content=orjson.dumps(body))
+            response.raise_for_status()
+            payload = orjson.loads(response.content)
+        except Exception as e:
+            logger.warning("[HandbookAPIClient] %s %s lookup failed: %s", kind, code, e)
+            return None
+
+        hits = payload.get("contentlets")
+        if hits is None:
+            hits = [h.get("_source", {}) for h in payload.get("hits", {}).get("hits", [])]
+        if not hits:
+            return None
+        record = hits[0]
+        # the page data is nested as a JSON string inside the contentlet
+        data = record.get("data")
+        if isinstance(data, str):
+            try:
+                data = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                data = None
+        record = {**record, **data} if isinstance(data, dict) else record
+        # the response schema is not documented, so anything that is not clearly this code's
+        # record is treated as a miss rather than cached for a day
+        if str(record.get("code") or "").strip().upper() != code.upper():
+            logger.debug("[HandbookAPIClient] %s %s: record code %r does not match", kind, code, record.get("code"))
+            return None
+        if not str(record.get("title") or "").strip():
+            logger.debug("[HandbookAPIClient] %s %s: record has no title", kind, code)
+            return None
+        return record
+
+    @staticmethod
+    def _summary(record: dict, code: str) -> tuple[str, str, Optional[str], list[str]]:
+        """Return (title, description, credits, related course codes) from an API record."""
+        title = str(record["title"]).strip()
+        description = _TAG_RE.sub("", str(record.get("description") or record.get("overview") or "")).strip()
+        credits = record.get("credit_points") or record.get("creditPoints")
+        structure = record.get("structure") or record.get("curriculumStructure") or []
+        codes = [c for c in dict.fromkeys(_CODE_RE.findall(orjson.dumps(structure).decode())) if c != code]
+        return title, description, str(credits) if credits else None, codes
+
+    def program(self, program_code: str, year: str = "2026", level: str = "postgraduate") -> Optional[dict]:
+        """Return {url, title, overview, courses} for a program, shaped like scrape_program()."""
+        record = self._search("program", program_code, year)
+        if record is None:
+            return None
+        title, description, credits, codes = self._summary(record, program_code)
+        overview = [f"Program: {title}\n"]
+        if description:
+            overview.append(f"{description}\n")
+        if credits:
+            overview.append(f"\nTotal Credits: {credits} UoC\n")
+        return {
+            "url": f"{self.base_url}/{level}/programs/{year}/{program_code}",
+            "title": title,
+            "overview": "\n".join(overview),
+            "courses": codes[:_MAX_COURSES],
+        }
+
+    def course(self, course_code: str, year: str = "2026") -> Optional[dict]:
+        """Return {url, title, overview, credits, courses} for a course, shaped like scrape_courses_bulk()."""
+        record = self._search("course", course_code, year)
+        if record is None:
+            return None
+        title, description, credits, codes = self._summary(record, course_code)
+        level = str(record.get("study_level_url") or record.get("studyLevelURL") or "").lower()
+        if level not in ("postgraduate", "undergraduate"):
+            logger.debug("[HandbookAPIClient] course %s: unknown study level %r", course_code, level)
+            return None
+        return {
+            "url": f"{self.base_url}/{level}/courses/{year}/{course_code}",
+            "title": title,
+            "overview": [description] if description else [],
+            "credits": credits,
+            "courses": [{"code": c, "name": "", "uoc": None} for c in codes[:_MAX_COURSES]],
+        }
+
+
+_api_client: Optional[HandbookAPIClient] = None
+
+
+def _get_api_client() -> Optional[HandbookAPIClient]:
+    """Return the shared API client, or None when httpx is not installed."""
+    global _api_client
+    if _api_client is None and httpx is not None:
+        _api_client = HandbookAPIClient()
+    return _api_client
+
 
 class HandbookScraperPlaywright:
     """Web scraper for UNSW Handbook using Playwright for JavaScript rendering."""
 
     def __init__(self):
-        self._playwright = None
-        self._browser = None
+        self._context = None
         self._page = None
+        self._headless = True
         self.current_url = None
         self.base_url = "https://www.handbook.unsw.edu.au"
+        # ("text", url) -> body innerText, cleared on every navigation
+        self._content_cache: dict[tuple[str, str], str] = {}
 
-    def start_browser(self, headless: bool = True) -> str:
+    @_on_pool_loop
+    async def start_browser(self, headless: bool = True) -> str:
         """Start browser session.
 
         Args:
@@ -36,19 +373,17 @@ class HandbookScraperPlaywright:
         Returns:
             Success message
         """
-        if self._browser:
+        if self._page:
             return "Browser already started"
 
-        self._playwright = sync_playwright().start()
-        self._browser = self._playwright.chromium.launch(headless=headless)
-        self._page = self._browser.new_page()
-
-        # Set a reasonable timeout
-        self._page.set_default_timeout(30000)  # 30 seconds
+        # check out a warm page; the browser process is only launched once per process
+        self._headless = headless
+        self._context, self._page = await _checkout_page(headless)
 
         return f"Browser started (headless={headless})"
 
-    def navigate_to_program(self, program_code: str, year: str = "2026", level: str = "postgraduate") -> str:
+    @_on_pool_loop
+    async def navigate_to_program(self, program_code: str, year: str = "2026", level: str = "postgraduate") -> str:
         """Navigate to a specific program page.
 
         Args:
@@ -60,24 +395,25 @@ class HandbookScraperPlaywright:
             Success message with page title
         """
         if not self._page:
-            return "Error: Browser not started. Call start_browser() first."
+            # launched lazily, the shared browser makes this a pool checkout after the first call
+            await self.start_browser(self._headless)
 
         url = f"{self.base_url}/{level}/programs/{year}/{program_code}"
 
         try:
-            self._page.goto(url, wait_until="networkidle")
-
-            # Wait for main content to load
-            self._page.wait_for_selector("h1", timeout=10000)
+            # networkidle waits for analytics beacons to settle, the DOM is enough here
+            await self._page.goto(url, wait_until="domcontentloaded")
 
-            # Extra wait for dynamic content
-            time.sleep(2)
+            # Wait for the heading and the overview block instead of a fixed sleep
+            await self._page.wait_for_selector("h1", state="visible", timeout=10000)
+            await self._page.wait_for_selector(_OVERVIEW_SELECTOR, timeout=10000)
 
             self.current_url = url
+            self._content_cache.clear()
 
-            title = self._page.title()
-            h1 = self._page.query_selector("h1")
-            h1_text = h1.inner_text() if h1 else "Unknown"
+            title = await self._page.title()
+            h1 = await self._page.query_selector("h1")
+            h1_text = await h1.inner_text() if h1 else "Unknown"
 
             return f"Successfully loaded: {h1_text}\nPage title: {title}\nURL: {url}"
 
@@ -86,7 +422,8 @@ class HandbookScraperPlaywright:
         except Exception as e:
             return f"Error loading page: {str(e)}\nURL: {url}"
 
-    def navigate_to_course(self, course_code: str, year: str = "2026") -> str:
+    @_on_pool_loop
+    async def navigate_to_course(self, course_code: str, year: str = "2026") -> str:
         """Navigate to a specific course page.
 
         Args:
@@ -97,22 +434,75 @@ class HandbookScraperPlaywright:
             Success message
         """
         if not self._page:
-            return "Error: Browser not started. Call start_browser() first."
+            await self.start_browser(self._headless)
 
+        # postgraduate first, undergraduate only when that page fails to load; both levels
+        # render an h1 for missing courses too, so racing them would pick a page at random
         levels = ["postgraduate", "undergraduate"]
         last_err = None
         for lvl in levels:
             url = f"{self.base_url}/{lvl}/courses/{year}/{course_code}"
             try:
-                self._page.goto(url, wait_until="networkidle")
-                self._page.wait_for_selector("h1", timeout=10000)
-                self.current_url = url
-                return f"Successfully loaded course: {self._page.title()}\nURL: {url}"
+                self.current_url = await _load_course_page(self._page, url)
+                self._content_cache.clear()
+                return f"Successfully loaded course: {await self._page.title()}\nURL: {url}"
             except Exception as e:
                 last_err = e
 
-        # fallback to site search if direct URLs fail
-        return self.search_course_via_ui(course_code, year)
+        return f"Error loading course {course_code}: {last_err}"
+
+    @_on_pool_loop
+    async def scrape_courses_bulk(
+        self, course_codes: list[str], year: str = "2026", concurrency: int = _COURSE_FETCH_CONCURRENCY
+    ) -> dict[str, dict]:
+        """Load and parse several course pages concurrently, each in its own pooled browser context.
+
+        Args:
+            course_codes: Course codes (e.g., ["COMP9021", "COMP9024"])
+            year: Handbook year (default: "2026")
+            concurrency: Maximum pages loading at once (default: _COURSE_FETCH_CONCURRENCY)
+
+        Returns:
+            Mapping of course code to {url, title, overview, credits, courses}, or to {"error": ...}
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _scrape(code: str) -> dict:
+            key = f"course-{code}-{year}"
+            cached = _handbook_cache.get(key)
+            if cached is not None:
+                return cached
+            async with semaphore:
+                client = _get_api_client()
+                if client is not None:
+                    result = await asyncio.to_thread(client.course, code, year)
+                    if result is not None:
+                        _handbook_cache.put(key, result)
+                        return result
+                scraper = HandbookScraperPlaywright()
+                await scraper.start_browser(headless=self._headless)
+                try:
+                    message = await scraper.navigate_to_course(code, year)
+                    if not message.startswith("Successfully"):
+                        return {"error": message}
+                    url = scraper.current_url
+                    data = await scraper._extract_handbook()
+                except Exception as e:
+                    return {"error": f"Error scraping {code}: {str(e)}"}
+                finally:
+                    await scraper.close_browser()
+            result = {
+                "url": url,
+                "title": (data["h1"] or "").strip(),
+                "overview": data["overview"],
+                "credits": data["credits"],
+                "courses": data["courses"],
+            }
+            _handbook_cache.put(key, result)
+            return result
+
+        results = await asyncio.gather(*(_scrape(code) for code in course_codes))
+        return dict(zip(course_codes, results))
     """ 
     def search_course_via_ui(self, course_code: str, year: str = "2026") -> str:
         if not self._page:
@@ -143,7 +533,30 @@ class HandbookScraperPlaywright:
         return f"Opened via search: {self._page.title()}\nURL: {self.current_url}"
     """  
 
-    def get_full_page_text(self) -> str:
+    @_on_pool_loop
+    async def _extract_handbook(self) -> dict:
+        """Run the injected extractor and return h1, overview, credits, paragraphs and courses."""
+        return await self._page.evaluate(
+            "opts => window.__extractHandbook__(opts)",
+            {
+                "overviewSelector": _OVERVIEW_TEXT_SELECTOR,
+                "maxBlocks": _OVERVIEW_MAX_BLOCKS,
+                "maxCourses": _MAX_COURSES,
+            },
+        )
+
+    @_on_pool_loop
+    async def _page_text(self) -> str:
+        """Return the body innerText of the current page, fetched at most once per URL."""
+        key = ("text", self.current_url)
+        text = self._content_cache.get(key)
+        if text is None:
+            text = await self._page.inner_text("body")
+            self._content_cache[key] = text
+        return text
+
+    @_on_pool_loop
+    async def get_full_page_text(self) -> str:
         """Get all visible text from current page.
 
         Returns:
@@ -154,16 +567,12 @@ class HandbookScraperPlaywright:
 
         try:
             # Get text content from body
-            body = self._page.query_selector("body")
-            if body:
-                text = body.inner_text()
-                return text
-            else:
-                return "Error: Could not find page body"
+            return await self._page_text()
         except Exception as e:
             return f"Error extracting text: {str(e)}"
 
-    def extract_program_overview(self) -> str:
+    @_on_pool_loop
+    async def extract_program_overview(self) -> str:
         """Extract program overview from current page.
 
         Returns:
@@ -174,50 +583,49 @@ class HandbookScraperPlaywright:
 
         try:
             result = []
+            data = await self._extract_handbook()
 
             # Get title
-            h1 = self._page.query_selector("h1")
-            if h1:
-                result.append(f"Program: {h1.inner_text()}\n")
+            if data["h1"] is not None:
+                result.append(f"Program: {data['h1']}\n")
 
             # Get program description/overview
-            # Try different selectors for overview content
-            overview_selectors = [
-                ".program-overview",
-                ".overview",
-                "[class*='overview']",
-                ".program-description",
-                "main p"
-            ]
-
-            for selector in overview_selectors:
-                elements = self._page.query_selector_all(selector)
-                if elements:
-                    for elem in elements[:3]:  # Limit to first 3
-                        text = elem.inner_text().strip()
-                        if text and len(text) > 30:
-                            result.append(f"{text}\n")
-
-            # Look for UoC in page text
-            page_text = self._page.content()
-            credit_match = re.search(r'(\d+)\s*(?:UoC|units of credit)', page_text, re.IGNORECASE)
-            if credit_match:
-                result.append(f"\nTotal Credits: {credit_match.group(1)} UoC\n")
+            for text in data["overview"]:
+                result.append(f"{text}\n")
+
+            if data["credits"]:
+                result.append(f"\nTotal Credits: {data['credits']} UoC\n")
 
             if not result:
                 # Fallback: get first few paragraphs
-                paragraphs = self._page.query_selector_all("p")
-                for p in paragraphs[:5]:
-                    text = p.inner_text().strip()
-                    if len(text) > 50:
-                        result.append(f"{text}\n")
+                for text in data["paragraphs"]:
+                    result.append(f"{text}\n")
 
             return "\n".join(result) if result else "No overview information found."
 
         except Exception as e:
             return f"Error extracting overview: {str(e)}"
 
-    def extract_courses(self) -> str:
+    @_on_pool_loop
+    async def _course_list(self) -> list[str]:
+        """Return the "CODE - Name (N UoC)" lines for the courses on the current page."""
+        courses = []
+
+        # The course list renders after the DOM is ready, give it a chance to appear
+        try:
+            await self._page.wait_for_selector(_COURSE_LIST_SELECTOR, timeout=10000)
+        except PlaywrightTimeout:
+            pass
+
+        for course in (await self._extract_handbook())["courses"]:
+            if course["name"]:
+                courses.append(f"{course['code']} - {course['name']} ({course['uoc'] or '?'} UoC)")
+            else:
+                courses.append(f"{course['code']}")
+        return courses
+
+    @_on_pool_loop
+    async def extract_courses(self) -> str:
         """Extract all courses listed on current page.
 
         Returns:
@@ -227,53 +635,7 @@ class HandbookScraperPlaywright:
             return "Error: No page loaded"
 
         try:
-            courses = []
-
-            # Get full page HTML
-            page_content = self._page.content()
-
-            # Pattern to match course codes (e.g., COMP9021, INFS1000)
-            course_pattern = re.compile(r'\b([A-Z]{4}\d{4})\b')
-
-            # Find all course codes
-            course_codes = course_pattern.findall(page_content)
-
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_codes = []
-            for code in course_codes:
-                if code not in seen:
-                    seen.add(code)
-                    unique_codes.append(code)
-
-            # Try to find course names
-            for code in unique_codes[:50]:  # Limit to 50 courses
-                # Look for text near the course code
-                # Try to find link or nearby text
-                selector = f"text={code}"
-                try:
-                    elem = self._page.query_selector(selector)
-                    if elem:
-                        # Get parent element to find course name
-                        parent = elem.evaluate("el => el.parentElement")
-                        if parent:
-                            parent_text = elem.evaluate("el => el.parentElement.innerText")
-                            # Extract course name (text after code)
-                            name_match = re.search(rf'{code}\s*[-–]?\s*([^()\n]+)', parent_text)
-                            if name_match:
-                                course_name = name_match.group(1).strip()
-
-                                # Look for UoC
-                                uoc_match = re.search(r'(\d+)\s*UoC', parent_text)
-                                uoc = uoc_match.group(1) if uoc_match else "?"
-
-                                courses.append(f"{code} - {course_name} ({uoc} UoC)")
-                            else:
-                                courses.append(f"{code}")
-                        else:
-                            courses.append(f"{code}")
-                except:
-                    courses.append(f"{code}")
+            courses = await self._course_list()
 
             if courses:
                 return "\n".join(courses)
@@ -283,7 +645,47 @@ class HandbookScraperPlaywright:
         except Exception as e:
             return f"Error extracting courses: {str(e)}"
 
-    def search_page(self, keyword: str) -> str:
+    @_on_pool_loop
+    async def scrape_program(self, program_code: str, year: str = "2026", level: str = "postgraduate") -> dict:
+        """Load a program page and return its title, overview and courses, served from disk when fresh.
+
+        Args:
+            program_code: Program code (e.g., "8543")
+            year: Handbook year (default: "2026")
+            level: "postgraduate" or "undergraduate" (default: "postgraduate")
+
+        Returns:
+            Dict with url, title, overview and courses, or an "error" entry
+        """
+        key = f"{level}-{program_code}-{year}"
+        cached = _handbook_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # the JSON API answers without a browser, Playwright is the fallback
+        client = _get_api_client()
+        if client is not None:
+            result = await asyncio.to_thread(client.program, program_code, year, level)
+            if result is not None:
+                _handbook_cache.put(key, result)
+                return result
+
+        # only touch Playwright on a miss
+        status = await self.navigate_to_program(program_code, year, level)
+        if not status.startswith("Successfully"):
+            return {"error": status}
+
+        result = {
+            "url": self.current_url,
+            "title": ((await self._extract_handbook())["h1"] or "").strip(),
+            "overview": await self.extract_program_overview(),
+            "courses": await self._course_list(),
+        }
+        _handbook_cache.put(key, result)
+        return result
+
+    @_on_pool_loop
+    async def search_page(self, keyword: str) -> str:
         """Search for keyword in current page.
 
         Args:
@@ -296,33 +698,38 @@ class HandbookScraperPlaywright:
             return "Error: No page loaded"
 
         try:
-            page_text = self.get_full_page_text()
-
-            # Find sentences containing keyword
-            lines = page_text.split('\n')
-            matches = [line.strip() for line in lines if keyword.lower() in line.lower()]
-
-            if matches:
-                # Remove duplicates
-                unique_matches = []
-                seen = set()
-                for match in matches:
-                    if match and match not in seen and len(match) > 5:
-                        seen.add(match)
-                        unique_matches.append(match)
-
-                return f"Found {len(unique_matches)} mentions:\n\n" + "\n\n".join(unique_matches[:10])
+            kw = keyword.lower()
+            cached = self._content_cache.get(("text", self.current_url))
+            if cached is None:
+                # filter inside the page so only the matching lines cross CDP
+                found = await self._page.evaluate(_SEARCH_LINES_JS, [kw, _SEARCH_MAX_RESULTS])
+                matched, total, lines = found["matched"], found["count"], found["lines"]
+            else:
+                # Find sentences containing keyword
+                matched, unique = False, {}
+                for line in cached.splitlines():
+                    if kw in line.lower():
+                        matched = True
+                        line = line.strip()
+                        if len(line) > 5:
+                            unique[line] = None
+                total, lines = len(unique), list(unique)[:_SEARCH_MAX_RESULTS]
+
+            if matched:
+                return f"Found {total} mentions:\n\n" + "\n\n".join(lines)
             else:
                 return f"No matches for '{keyword}'"
 
         except Exception as e:
             return f"Error searching: {str(e)}"
 
-    def take_screenshot(self, filename: str = "handbook_screenshot.png") -> str:
+    @_on_pool_loop
+    async def take_screenshot(self, filename: str = "handbook_screenshot.jpg", full_page: bool = False) -> str:
         """Take screenshot of current page.
 
         Args:
-            filename: Screenshot filename (default: "handbook_screenshot.png")
+            filename: Screenshot filename (default: "handbook_screenshot.jpg"), a .png name keeps PNG
+            full_page: Capture the whole scrollable page instead of the viewport (default: False)
 
         Returns:
             Success message with filename
@@ -331,7 +738,11 @@ class HandbookScraperPlaywright:
             return "Error: No page loaded"
 
         try:
-            self._page.screenshot(path=filename)
+            # PNG's zlib pass dominates screenshot cost, JPEG q70 of the viewport is far cheaper
+            if filename.lower().endswith(".png"):
+                await self._page.screenshot(path=filename, full_page=full_page)
+            else:
+                await self._page.screenshot(path=filename, type="jpeg", quality=70, full_page=full_page)
             return f"Screenshot saved: {filename}"
         except Exception as e:
             return f"Error taking screenshot: {str(e)}"
@@ -347,7 +758,8 @@ class HandbookScraperPlaywright:
         else:
             return "No page loaded"
 
-    def close_browser(self) -> str:
+    @_on_pool_loop
+    async def close_browser(self) -> str:
         """Close browser and clean up resources.
 
         Returns:
@@ -355,16 +767,13 @@ class HandbookScraperPlaywright:
         """
         try:
             if self._page:
-                self._page.close()
+                # the page goes back to the pool, shutdown_browsers() closes the shared browser
+                await _checkin_page(self._headless, self._context, self._page)
+                self._context = None
                 self._page = None
-            if self._browser:
-                self._browser.close()
-                self._browser = None
-            if self._playwright:
-                self._playwright.stop()
-                self._playwright = None
 
             self.current_url = None
+            self._content_cache.clear()
             return "Browser closed successfully"
 
         except Exception as e:
@@ -1,9 +1,37 @@
 from search_engine_parser.core.engines.yahoo import Search as YahooSearch
 from langchain_core.tools import BaseTool
 from typing import Type 
-import json
+import asyncio
+import orjson
 from pydantic import BaseModel, Field, PrivateAttr
 
+# the result shape differs between search_engine_parser versions; the accessor that
+# works is found on the first search and reused afterwards
+_RESULT_ACCESSORS = (
+    lambda r, k: getattr(r, k, None),  # attribute access
+    lambda r, k: r.get(k) if hasattr(r, 'get') else None,  # mapping style
+    lambda r, k: (r.__dict__ if hasattr(r, '__dict__') else dict(r)).get(k),  # plain dict
+)
+_result_accessor = None
+
+
+def _get_results(results) -> tuple[list, list, list]:
+    """Return (titles, links, descriptions) from a search_engine_parser result."""
+    global _result_accessor
+    if _result_accessor is not None:
+        return tuple(_result_accessor(results, k) or [] for k in ("titles", "links", "descriptions"))
+
+    for accessor in _RESULT_ACCESSORS:
+        try:
+            fields = tuple(accessor(results, k) or [] for k in ("titles", "links", "descriptions"))
+        except Exception:
+            continue
+        if all(isinstance(f, list) for f in fields) and any(fields):
+            _result_accessor = accessor
+            return fields
+    return [], [], []
+
+
 class YahooSearchArgs(BaseModel):
     query: str = Field(..., description="The search query string.")
     page: int = Field(1, description="page argument used by the library")
@@ -21,66 +49,33 @@ class YahooSearchTool(BaseTool):
             search_engine = YahooSearch()
             results = search_engine.search(query, page)
 
-            ans = []
-
-            # Try different ways to access the results based on library version
-            for accessor in (
-                lambda k: getattr(results, k, None),  # attribute access
-                lambda k: results.get(k) if hasattr(results, 'get') else None,  # mapping style
-            ):
-                try:
-                    titles = accessor("titles") or []
-                    links = accessor("links") or []
-                    descs = accessor("descriptions") or []
-
-                    if isinstance(titles, list) and isinstance(links, list) and isinstance(descs, list):
-                        size = min(len(titles), len(links), len(descs))
-                        ans = [
-                            {"title": titles[i], "url": links[i], "content": descs[i]}
-                            for i in range(size)
-                        ]
-                        if ans:
-                            print(f"[YahooSearchTool] Found {len(ans)} results")
-                            return json.dumps({"results": ans}, ensure_ascii=False)
-                except Exception:
-                    pass
-
-            # Fallback: try to convert to dict
             try:
-                if hasattr(results, '__dict__'):
-                    d = results.__dict__
-                else:
-                    d = dict(results)
-
-                titles = d.get("titles", [])
-                links = d.get("links", [])
-                descs = d.get("descriptions", [])
-
-                size = min(len(titles), len(links), len(descs))
-                ans = [
-                    {"title": titles[i], "url": links[i], "content": descs[i]}
-                    for i in range(size)
-                ]
+                titles, links, descs = _get_results(results)
+                ans = list(map(
+                    lambda t, l, d: {"title": t, "url": l, "content": d},
+                    titles, links, descs,
+                ))
 
                 if ans:
                     print(f"[YahooSearchTool] Found {len(ans)} results")
-                    return json.dumps({"results": ans}, ensure_ascii=False)
+                    return orjson.dumps({"results": ans}).decode()
                 else:
-                    return json.dumps({"results": [], "message": "No results found"}, ensure_ascii=False)
+                    return orjson.dumps({"results": [], "message": "No results found"}).decode()
 
             except Exception as e:
                 print(f"[YahooSearchTool] Error parsing results: {e}")
                 import traceback
                 traceback.print_exc()
-                return json.dumps({"error": str(e), "results": []}, ensure_ascii=False)
+                return orjson.dumps({"error": str(e), "results": []}).decode()
 
         except Exception as e:
             print(f"[YahooSearchTool] Error: {e}")
             import traceback
             traceback.print_exc()
-            return json.dumps({"error": str(e), "results": []}, ensure_ascii=False)
+            return orjson.dumps({"error": str(e), "results": []}).decode()
 
             
     async def _arun(self, query: str, page: int = 1):
-        return self._run(query, page)            
+        # search_engine_parser blocks on HTTP, keep it off the event loop so engines run concurrently
+        return await asyncio.to_thread(self._run, query, page)            
     
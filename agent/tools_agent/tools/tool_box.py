@@ -9,6 +9,10 @@ from .mcp.mcp_client import get_mcp_tools
 _mcp_tools: List[BaseTool] | None = None
 _mcp_lock = threading.Lock()
 
+# full tool list, built once per process so the RAG tool is not reconstructed every turn
+_tools: List[BaseTool] | None = None
+_tools_lock = threading.Lock()
+
 # Tools with schema incompatibilities for Gemini
 # These tools have array fields without 'items' definitions
 GEMINI_INCOMPATIBLE_TOOLS = [
@@ -65,6 +69,21 @@ def _ensure_mcp_tools() -> List[BaseTool]:
 
 
 def tool_box() -> List[BaseTool]:
+    """
+    Return the tools for the tool agent.
+    The list is built on first use and shared afterwards; callers must not mutate it.
+    """
+    global _tools
+    if _tools is not None:
+        return _tools
+
+    with _tools_lock:
+        if _tools is None:
+            _tools = _build_tool_box()
+    return _tools
+
+
+def _build_tool_box() -> List[BaseTool]:
     tools: List[BaseTool] = []
 
     # Add direct search tools (not via MCP to avoid async complexity)